@@ -0,0 +1,53 @@
+"""refresh session expiry
+
+Revision ID: 9b41c7e2a5d3
+Revises: fc283b94e4c6
+Create Date: 2026-10-17 19:20:11.482913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9b41c7e2a5d3"
+down_revision: Union[str, Sequence[str], None] = "fc283b94e4c6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "refresh_sessions",
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute(
+        "UPDATE refresh_sessions "
+        "SET expires_at = created_at + expires_in * interval '1 second'"
+    )
+    op.alter_column("refresh_sessions", "expires_at", nullable=False)
+    op.create_index(
+        op.f("refresh_sessions_expires_at_idx"),
+        "refresh_sessions",
+        ["expires_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("refresh_sessions_user_id_idx"),
+        "refresh_sessions",
+        ["user_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("refresh_sessions_user_id_idx"), table_name="refresh_sessions")
+    op.drop_index(
+        op.f("refresh_sessions_expires_at_idx"), table_name="refresh_sessions"
+    )
+    op.drop_column("refresh_sessions", "expires_at")
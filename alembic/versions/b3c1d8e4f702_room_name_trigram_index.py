@@ -0,0 +1,43 @@
+"""room name trigram index
+
+Revision ID: b3c1d8e4f702
+Revises: 68a7e44ed13f
+Create Date: 2026-10-17 20:41:12.503117
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b3c1d8e4f702"
+down_revision: Union[str, Sequence[str], None] = "68a7e44ed13f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Built concurrently so room writes are not blocked while the index builds.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "rooms_name_trgm_idx",
+            "rooms",
+            ["name"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "rooms_name_trgm_idx", table_name="rooms", postgresql_concurrently=True
+        )
@@ -0,0 +1,86 @@
+"""booking exclusion constraint
+
+Revision ID: fc283b94e4c6
+Revises: 5d6db2dce297
+Create Date: 2026-10-17 18:35:07.385328
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "fc283b94e4c6"
+down_revision: Union[str, Sequence[str], None] = "5d6db2dce297"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def check_existing_bookings() -> None:
+    # Fail with the offending rows instead of a bare constraint violation, so
+    # legacy data can be fixed before the constraints are added.
+    bind = op.get_bind()
+    invalid = (
+        bind.execute(
+            sa.text(
+                "SELECT id FROM bookings WHERE date_from >= date_to ORDER BY id LIMIT 10"
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if invalid:
+        raise RuntimeError(
+            "Bookings with date_from >= date_to must be fixed before this "
+            "migration, e.g. {}".format(", ".join(map(str, invalid)))
+        )
+
+    # A booking overlaps an earlier one in its room exactly when it starts
+    # before the latest date_to seen so far, which one sorted pass finds.
+    overlapping = (
+        bind.execute(
+            sa.text(
+                "SELECT id FROM ("
+                "SELECT id, date_from, max(date_to) OVER ("
+                "PARTITION BY room_id ORDER BY date_from, id "
+                "ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING"
+                ") AS previous_date_to FROM bookings"
+                ") AS ordered WHERE date_from < previous_date_to ORDER BY id LIMIT 10"
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if overlapping:
+        raise RuntimeError(
+            "Bookings overlapping an earlier booking of the same room must be "
+            "resolved before this migration, e.g. {}".format(
+                ", ".join(map(str, overlapping))
+            )
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    check_existing_bookings()
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.create_check_constraint(
+        op.f("bookings_date_range_check"), "bookings", "date_from < date_to"
+    )
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT bookings_room_id_dates_excl "
+        "EXCLUDE USING gist (room_id WITH =, daterange(date_from, date_to) WITH &&)"
+    )
+    op.drop_constraint("uq_room_booking", "bookings", type_="unique")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_unique_constraint(
+        "uq_room_booking", "bookings", ["room_id", "date_from", "date_to"]
+    )
+    op.drop_constraint("bookings_room_id_dates_excl", "bookings")
+    op.drop_constraint(op.f("bookings_date_range_check"), "bookings", type_="check")
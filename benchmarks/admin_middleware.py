@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import logging
+import statistics
+
+from time import perf_counter
+from uuid import UUID
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import Message, Receive, Scope, Send
+
+from src.admin import AdminCookieMiddleware
+from src.auth.service import AuthService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LegacyAdminCookieMiddleware(BaseHTTPMiddleware):
+    # The BaseHTTPMiddleware implementation this benchmark compares against.
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+
+        if (
+            request.url.path == "/admin/login"
+            and hasattr(request.state, "user_id")
+            and request.state.user_id
+        ):
+            token = await AuthService.create_token(request.state.user_id)
+            response.set_cookie("access_token", token.access_token, httponly=True)
+            response.set_cookie("refresh_token", token.refresh_token, httponly=True)
+
+        if request.url.path == "/admin/logout":
+            response.delete_cookie("access_token")
+            response.delete_cookie("refresh_token")
+
+            refresh_token = request.cookies.get("refresh_token")
+            if refresh_token:
+                await AuthService.logout(UUID(refresh_token))
+        return response
+
+
+async def endpoint(scope: Scope, receive: Receive, send: Send) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def receive() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message: Message) -> None:
+    pass
+
+
+def make_scope(path: str) -> Scope:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark")],
+        "client": ("127.0.0.1", 1234),
+        "server": ("benchmark", 80),
+    }
+
+
+async def measure(app, path: str, requests: int, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = perf_counter()
+        for _ in range(requests):
+            await app(make_scope(path), receive, send)
+        timings.append((perf_counter() - started) / requests)
+    return statistics.median(timings) * 1_000_000
+
+
+async def run(path: str, requests: int, rounds: int) -> dict:
+    apps = {
+        "none": endpoint,
+        "base_http_middleware": LegacyAdminCookieMiddleware(endpoint),
+        "asgi_middleware": AdminCookieMiddleware(endpoint),
+    }
+    timings = {
+        name: await measure(app, path, requests, rounds) for name, app in apps.items()
+    }
+    return {
+        "path": path,
+        "requests": requests,
+        **{f"{name}_us": round(value, 2) for name, value in timings.items()},
+        "base_http_middleware_overhead_us": round(
+            timings["base_http_middleware"] - timings["none"], 2
+        ),
+        "asgi_middleware_overhead_us": round(
+            timings["asgi_middleware"] - timings["none"], 2
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure per-request overhead of the admin cookie middleware"
+    )
+    parser.add_argument("--path", default="/rooms")
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.path, args.requests, args.rounds))
+    logger.info("%s", result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import subprocess
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+import httpx
+
+from src.config import settings
+from src.main import app
+
+from .seed import BENCHMARK_EMAIL, BENCHMARK_PASSWORD, BOOKINGS_START
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Every benchmark request comes from the same client, so per-client limits
+# would turn the login and booking scenarios into 429 measurements.
+settings.RATE_LIMIT_ENABLED = False
+
+
+@dataclass
+class Context:
+    users: int
+    rooms: int
+    room_ids: list[str] = field(default_factory=list)
+    rng: random.Random = field(default_factory=random.Random)
+
+    def random_stay(self, max_days: int = 7) -> tuple[date, date]:
+        date_from = BOOKINGS_START + timedelta(days=self.rng.randint(0, 3 * 365))
+        return date_from, date_from + timedelta(days=self.rng.randint(1, max_days))
+
+
+Request = Callable[[httpx.AsyncClient, Context], Awaitable[httpx.Response]]
+
+
+async def login(client: httpx.AsyncClient, context: Context) -> httpx.Response:
+    email = BENCHMARK_EMAIL.format(context.rng.randrange(min(context.users, 1000)))
+    return await client.post(
+        "/auth/login", json={"email": email, "password": BENCHMARK_PASSWORD}
+    )
+
+
+async def rooms_search(client: httpx.AsyncClient, context: Context) -> httpx.Response:
+    return await client.get("/rooms", params={"limit": 20})
+
+
+async def rooms_search_dates(
+    client: httpx.AsyncClient, context: Context
+) -> httpx.Response:
+    date_from, date_to = context.random_stay()
+    return await client.get(
+        "/rooms",
+        params={
+            "limit": 20,
+            "date_from": date_from.isoformat(),
+            "date_to": date_to.isoformat(),
+        },
+    )
+
+
+async def rooms_deep_offset(
+    client: httpx.AsyncClient, context: Context
+) -> httpx.Response:
+    offset = context.rng.randrange(max(context.rooms - 20, 1))
+    return await client.get(
+        "/rooms", params={"limit": 20, "offset": offset, "count": "none"}
+    )
+
+
+async def booking_contention(
+    client: httpx.AsyncClient, context: Context
+) -> httpx.Response:
+    # Every client competes for the same few rooms and dates, so most
+    # requests end in 409 and exercise the conflict path.
+    date_from = date.today() + timedelta(days=3650 + context.rng.randrange(5))
+    return await client.post(
+        "/bookings",
+        json={
+            "user_id": str(uuid4()),
+            "room_id": context.rng.choice(context.room_ids[:5]),
+            "date_from": date_from.isoformat(),
+            "date_to": (date_from + timedelta(days=2)).isoformat(),
+        },
+    )
+
+
+async def refresh(client: httpx.AsyncClient, context: Context) -> httpx.Response:
+    return await client.post("/auth/refresh")
+
+
+@dataclass
+class Scenario:
+    request: Request
+    authenticated: bool = False
+
+
+SCENARIOS = {
+    "rooms_search": Scenario(rooms_search),
+    "rooms_search_dates": Scenario(rooms_search_dates),
+    "rooms_deep_offset": Scenario(rooms_deep_offset),
+    "booking_contention": Scenario(booking_contention, authenticated=True),
+    "login": Scenario(login),
+    "refresh": Scenario(refresh, authenticated=True),
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+async def run_scenario(
+    scenario: Scenario, context: Context, requests: int, concurrency: int
+) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://benchmark"
+        ) as client:
+            if scenario.authenticated:
+                response = await login(client, context)
+                response.raise_for_status()
+                client.cookies.set("access_token", response.json()["access_token"])
+
+            while remaining > 0:
+                remaining -= 1
+                started = perf_counter()
+                response = await scenario.request(client, context)
+                latencies.append(perf_counter() - started)
+                status = str(response.status_code)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    started = perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = perf_counter() - started
+
+    latencies_ms = [latency * 1000 for latency in latencies]
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies_ms), 2),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(
+    names: list[str],
+    requests: int,
+    concurrency: int,
+    users: int,
+    rooms: int,
+    seed: int,
+) -> dict:
+    context = Context(users=users, rooms=rooms, rng=random.Random(seed))
+    results = {}
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+        ) as client:
+            response = await client.get("/rooms", params={"limit": 100})
+            response.raise_for_status()
+            context.room_ids = [room["id"] for room in response.json()["data"]]
+
+        for name in names:
+            logger.info("Running %s...", name)
+            results[name] = await run_scenario(
+                SCENARIOS[name], context, requests, concurrency
+            )
+            logger.info("%s: %s", name, results[name])
+
+    return {
+        "revision": git_revision(),
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "parameters": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "users": users,
+            "rooms": rooms,
+            "seed": seed,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(baseline: dict, current: dict) -> None:
+    for name, result in current["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        changes = ", ".join(
+            f"{metric} {previous[metric]} -> {result[metric]}"
+            f" ({(result[metric] - previous[metric]) / previous[metric]:+.0%})"
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+            if previous[metric]
+        )
+        logger.info("%s: %s", name, changes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark API endpoints in-process")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="scenario to run (repeatable, default: all)",
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--users", type=int, default=100_000, help="users created by the seeder"
+    )
+    parser.add_argument(
+        "--rooms", type=int, default=10_000, help="rooms created by the seeder"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="where to write the JSON results")
+    parser.add_argument(
+        "--compare", type=Path, help="earlier results file to compare against"
+    )
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run(
+            args.scenario or list(SCENARIOS),
+            requests=args.requests,
+            concurrency=args.concurrency,
+            users=args.users,
+            rooms=args.rooms,
+            seed=args.seed,
+        )
+    )
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{result['revision'] or 'unknown'}.json"
+    output.write_text(json.dumps(result, indent=2))
+    logger.info("Results written to %s", output)
+
+    if args.compare is not None:
+        compare(json.loads(args.compare.read_text()), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import logging
+import resource
+
+from time import perf_counter
+
+from src.export import ExportFormat
+from src.rooms.service import RoomService
+from src.bookings.service import BookingService
+
+from src.auth.models import RefreshSessionModel
+from src.users.models import UserModel
+from src.rooms.models import RoomModel
+from src.bookings.models import BookingModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run(table: str, export_format: ExportFormat) -> dict:
+    if table == "rooms":
+        stream = RoomService.export_rooms(export_format)
+    else:
+        stream = BookingService.export_bookings(export_format)
+
+    rows = 0
+    size = 0
+    started = perf_counter()
+    async for chunk in stream:
+        rows += chunk.count(b"\n")
+        size += len(chunk)
+    elapsed = perf_counter() - started
+
+    if export_format == ExportFormat.csv:
+        rows -= 1
+
+    return {
+        "table": table,
+        "format": export_format.value,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows / elapsed) if elapsed else None,
+        "megabytes": round(size / 2**20, 2),
+        "max_rss_megabytes": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure export throughput")
+    parser.add_argument("--table", choices=["rooms", "bookings"], default="bookings")
+    parser.add_argument(
+        "--format",
+        choices=[export_format.value for export_format in ExportFormat],
+        default=ExportFormat.ndjson.value,
+    )
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.table, ExportFormat(args.format)))
+    logger.info("%s", result)
+
+
+if __name__ == "__main__":
+    main()
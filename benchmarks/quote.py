@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+
+from datetime import date, timedelta
+from time import perf_counter
+
+from sqlalchemy import select
+
+from src.bookings.availability import availability_index
+from src.bookings.service import BookingService
+from src.database import async_session_maker
+from src.rooms.schemas import QuoteRequest, StayRange
+from src.rooms.service import RoomService
+
+from src.auth.models import RefreshSessionModel
+from src.users.models import UserModel
+from src.rooms.models import RoomModel
+from src.bookings.models import BookingModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def make_ranges(count: int, rng: random.Random) -> list[StayRange]:
+    ranges = []
+    for _ in range(count):
+        date_from = date.today() + timedelta(days=rng.randint(0, 180))
+        ranges.append(
+            StayRange(
+                date_from=date_from,
+                date_to=date_from + timedelta(days=rng.randint(1, 14)),
+            )
+        )
+    return ranges
+
+
+async def per_room_baseline(quote: QuoteRequest) -> None:
+    # What the search page did before: one room lookup per result.
+    for room_id in quote.room_ids:
+        await RoomService.get_room(room_id)
+
+
+async def measure(func, quote: QuoteRequest, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = perf_counter()
+        await func(quote)
+        timings.append(perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+async def run(rooms: int, ranges: int, rounds: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    async with async_session_maker() as session:
+        room_ids = (
+            (await session.execute(select(RoomModel.id).limit(rooms))).scalars().all()
+        )
+    quote = QuoteRequest(room_ids=room_ids, ranges=make_ranges(ranges, rng))
+
+    result = {"rooms": len(room_ids), "ranges": ranges}
+    result["per_room_requests_ms"] = round(
+        await measure(per_room_baseline, quote, rounds), 2
+    )
+    result["set_based_query_ms"] = round(
+        await measure(RoomService.get_quotes, quote, rounds), 2
+    )
+
+    await BookingService.load_availability()
+    result["availability_index_ms"] = round(
+        await measure(RoomService.get_quotes, quote, rounds), 2
+    )
+    result["availability_index"] = availability_index.stats()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure POST /rooms/quote for many rooms and stays"
+    )
+    parser.add_argument("--rooms", type=int, default=1000)
+    parser.add_argument("--ranges", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.rooms, args.ranges, args.rounds, args.seed))
+    logger.info("%s", result)
+
+
+if __name__ == "__main__":
+    main()
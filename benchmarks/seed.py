@@ -0,0 +1,189 @@
+import argparse
+import asyncio
+import logging
+import random
+
+from datetime import date, timedelta
+from time import perf_counter
+from typing import Iterator
+from uuid import UUID, uuid4
+
+import asyncpg
+
+from src.auth.utils import get_password_hash
+from src.config import settings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BENCHMARK_PASSWORD = "benchmark"
+BENCHMARK_EMAIL = "bench-{}@example.com"
+BOOKINGS_START = date.today() - timedelta(days=365)
+
+
+def user_records(count: int, hashed_password: str) -> Iterator[tuple]:
+    for i in range(count):
+        yield (
+            uuid4(),
+            f"Name{i}",
+            f"Surname{i}",
+            f"Patronymic{i}",
+            BENCHMARK_EMAIL.format(i),
+            hashed_password,
+            True,
+            False,
+        )
+
+
+def room_records(count: int, rng: random.Random) -> Iterator[tuple]:
+    for i in range(count):
+        yield uuid4(), f"bench-room-{i}", rng.randrange(1000, 30000) / 100, rng.randint(
+            1, 6
+        )
+
+
+def booking_records(
+    count: int, room_ids: list[UUID], user_ids: list[UUID], rng: random.Random
+) -> Iterator[tuple]:
+    # Stays in each room are laid out back to back with random lengths and
+    # gaps, so they never overlap and the exclusion constraint holds.
+    per_room, remainder = divmod(count, len(room_ids))
+    for index, room_id in enumerate(room_ids):
+        day = BOOKINGS_START + timedelta(days=rng.randint(0, 3))
+        for _ in range(per_room + (index < remainder)):
+            date_to = day + timedelta(days=rng.randint(1, 7))
+            yield uuid4(), rng.choice(user_ids), room_id, day, date_to
+            day = date_to + timedelta(days=rng.randint(0, 3))
+
+
+async def copy(
+    connection: asyncpg.Connection,
+    table: str,
+    columns: list[str],
+    records: Iterator[tuple],
+    batch_size: int,
+) -> int:
+    started = perf_counter()
+    total = 0
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            await connection.copy_records_to_table(
+                table, records=batch, columns=columns
+            )
+            total += len(batch)
+            batch = []
+            logger.info("%s: %s rows", table, total)
+    if batch:
+        await connection.copy_records_to_table(table, records=batch, columns=columns)
+        total += len(batch)
+
+    logger.info("%s: %s rows in %.1f s", table, total, perf_counter() - started)
+    return total
+
+
+async def seed(
+    rooms: int,
+    users: int,
+    bookings: int,
+    truncate: bool,
+    batch_size: int,
+    seed_value: int,
+) -> None:
+    rng = random.Random(seed_value)
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg", "postgresql")
+    connection = await asyncpg.connect(dsn)
+    try:
+        if truncate:
+            logger.info("Removing benchmark data from previous runs...")
+            await connection.execute(
+                """
+                DELETE FROM bookings
+                WHERE room_id IN (SELECT id FROM rooms WHERE name LIKE 'bench-room-%')
+                OR user_id IN (
+                    SELECT id FROM users WHERE email LIKE 'bench-%@example.com'
+                )
+                """
+            )
+            await connection.execute(
+                "DELETE FROM users WHERE email LIKE 'bench-%@example.com'"
+            )
+            await connection.execute("DELETE FROM rooms WHERE name LIKE 'bench-room-%'")
+
+        hashed_password = get_password_hash(BENCHMARK_PASSWORD)
+        user_rows = list(user_records(users, hashed_password))
+        room_rows = list(room_records(rooms, rng))
+
+        await copy(
+            connection,
+            "users",
+            [
+                "id",
+                "name",
+                "surname",
+                "patronymic",
+                "email",
+                "hashed_password",
+                "is_active",
+                "is_superuser",
+            ],
+            iter(user_rows),
+            batch_size,
+        )
+        await copy(
+            connection,
+            "rooms",
+            ["id", "name", "price_per_day", "places"],
+            iter(room_rows),
+            batch_size,
+        )
+        if bookings and room_rows and user_rows:
+            await copy(
+                connection,
+                "bookings",
+                ["id", "user_id", "room_id", "date_from", "date_to"],
+                booking_records(
+                    bookings,
+                    [row[0] for row in room_rows],
+                    [row[0] for row in user_rows],
+                    rng,
+                ),
+                batch_size,
+            )
+
+        await connection.execute("ANALYZE users")
+        await connection.execute("ANALYZE rooms")
+        await connection.execute("ANALYZE bookings")
+    finally:
+        await connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Seed the database for benchmarks")
+    parser.add_argument("--rooms", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="remove benchmark users and rooms (and their bookings) first",
+    )
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(
+        seed(
+            rooms=args.rooms,
+            users=args.users,
+            bookings=args.bookings,
+            truncate=args.truncate,
+            batch_size=args.batch_size,
+            seed_value=args.seed,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,4 +5,5 @@ echo "Running Alembic migrations..."
 alembic upgrade head
 
 echo "Starting Uvicorn server..."
-exec uvicorn src.main:app --host 0.0.0.0 --port 8000
+exec uvicorn src.main:app --host 0.0.0.0 --port 8000 \
+    --limit-concurrency "${UVICORN_LIMIT_CONCURRENCY:-1000}"
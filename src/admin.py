@@ -1,8 +1,9 @@
 from uuid import UUID
 
-from jose import jwt
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from starlette.middleware.base import BaseHTTPMiddleware
+from sqlalchemy import Select
 
 from sqladmin import ModelView
 from sqladmin.authentication import AuthenticationBackend
@@ -12,40 +13,76 @@ from fastapi import Request, Response
 from .config import settings
 
 from .auth.service import AuthService
-from .users.service import UserService
+from .auth.tokens import decode_access_token
+from .users.service import UserService, user_cache
+from .bookings.service import BookingService
+from .rooms.dao import RoomDAO
 
 from .users.models import UserModel
 from .rooms.models import RoomModel
 from .bookings.models import BookingModel
 
 
-class AdminCookieMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        response: Response = await call_next(request)
-
-        if request.url.path == "/admin/login" and hasattr(request.state, "user_id") and request.state.user_id:
-            token = await AuthService.create_token(request.state.user_id)
-            response.set_cookie(
-                "access_token",
-                token.access_token,
-                max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-                httponly=True,
-            )
-            response.set_cookie(
-                "refresh_token",
-                token.refresh_token,
-                max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 30 * 24 * 60,
-                httponly=True,
-            )
-
-        if request.url.path == "/admin/logout":
-            response.delete_cookie("access_token")
-            response.delete_cookie("refresh_token")
-
-            refresh_token = request.cookies.get("refresh_token")
-            if refresh_token:
-                await AuthService.logout(UUID(refresh_token))
-        return response
+ADMIN_LOGIN_PATH = "/admin/login"
+ADMIN_LOGOUT_PATH = "/admin/logout"
+
+
+class AdminCookieMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path")
+        if scope["type"] != "http" or (
+            path != ADMIN_LOGIN_PATH and path != ADMIN_LOGOUT_PATH
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookies(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                cookies = Response()
+                if path == ADMIN_LOGIN_PATH:
+                    await self.set_token_cookies(scope, cookies)
+                else:
+                    await self.delete_token_cookies(scope, cookies)
+
+                headers = MutableHeaders(scope=message)
+                for name, value in cookies.raw_headers:
+                    if name == b"set-cookie":
+                        headers.append("set-cookie", value.decode("latin-1"))
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookies)
+
+    @staticmethod
+    async def set_token_cookies(scope: Scope, response: Response) -> None:
+        user_id = scope.get("state", {}).get("user_id")
+        if not user_id:
+            return
+
+        token = await AuthService.create_token(user_id)
+        response.set_cookie(
+            "access_token",
+            token.access_token,
+            max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+            httponly=True,
+        )
+        response.set_cookie(
+            "refresh_token",
+            token.refresh_token,
+            max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 30 * 24 * 60,
+            httponly=True,
+        )
+
+    @staticmethod
+    async def delete_token_cookies(scope: Scope, response: Response) -> None:
+        response.delete_cookie("access_token")
+        response.delete_cookie("refresh_token")
+
+        refresh_token = Request(scope).cookies.get("refresh_token")
+        if refresh_token:
+            await AuthService.logout(UUID(refresh_token))
 
 
 class AdminAuth(AuthenticationBackend):
@@ -62,7 +99,7 @@ class AdminAuth(AuthenticationBackend):
             request.state.user_id = user.id
             return True
         return False
-    
+
     async def logout(self, request: Request) -> bool:
         return True
 
@@ -72,11 +109,7 @@ class AdminAuth(AuthenticationBackend):
             return False
         token = token.split(" ", 1)[1]
         try:
-            payload = jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=[settings.ALGORITHM],
-            )
+            payload = decode_access_token(token)
             user_id = payload.get("sub")
             if not user_id:
                 return False
@@ -99,6 +132,16 @@ class UserAdmin(ModelView, model=UserModel):
     column_exclude_list = ["bookings", "hashed_password", "created_at", "modified_at"]
     column_details_exclude_list = ["hashed_password"]
 
+    # Edits here bypass UserService, so a deactivated user or a revoked
+    # superuser would otherwise keep access until the cached entry expires.
+    async def after_model_change(
+        self, data: dict, model: UserModel, is_created: bool, request: Request
+    ) -> None:
+        user_cache.invalidate(model.id)
+
+    async def after_model_delete(self, model: UserModel, request: Request) -> None:
+        user_cache.invalidate(model.id)
+
 
 class RoomAdmin(ModelView, model=RoomModel):
     form_excluded_columns = ["created_at", "modified_at"]
@@ -107,9 +150,24 @@ class RoomAdmin(ModelView, model=RoomModel):
     column_exclude_list = ["bookings", "created_at", "modified_at"]
     column_sortable_list = [RoomModel.price_per_day, RoomModel.places]
 
+    def search_query(self, stmt: Select, term: str) -> Select:
+        # sqladmin's default CAST(name AS VARCHAR) ILIKE cannot use the trigram
+        # index; this is the same filter as GET /rooms?q=.
+        return stmt.filter(RoomDAO.name_filter(term))
+
 
 class BookingAdmin(ModelView, model=BookingModel):
     form_excluded_columns = ["created_at", "modified_at"]
 
     column_sortable_list = [BookingModel.user_id, BookingModel.room_id]
     column_exclude_list = ["user", "room", "created_at", "modified_at"]
+
+    # Edits here bypass BookingService, which keeps room_day_occupancy and the
+    # availability index in step with bookings.
+    async def after_model_change(
+        self, data: dict, model: BookingModel, is_created: bool, request: Request
+    ) -> None:
+        await BookingService.sync_booking(model)
+
+    async def after_model_delete(self, model: BookingModel, request: Request) -> None:
+        BookingService.forget_booking(model)
@@ -0,0 +1,210 @@
+import asyncio
+
+from collections import deque
+from enum import Enum
+from time import perf_counter
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import settings
+from .monitoring.metrics import Counter, Gauge, Histogram
+
+
+class Lane(str, Enum):
+    critical = "critical"
+    default = "default"
+    bulk = "bulk"
+
+
+# Lanes in the order waiting requests are admitted.
+LANES = (Lane.critical, Lane.default, Lane.bulk)
+
+
+class Overloaded(Exception):
+    pass
+
+
+requests_shed = Counter(
+    "http_requests_shed",
+    "Requests rejected by admission control.",
+    labelnames=("lane", "reason"),
+)
+queue_wait_seconds = Histogram(
+    "http_admission_queue_wait_seconds",
+    "Time requests spent waiting for an admission slot.",
+    labelnames=("lane",),
+)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        max_queue_wait: float,
+        critical_reserved: int = 0,
+        bulk_max_concurrency: int | None = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queue_wait = max_queue_wait
+        self.critical_reserved = critical_reserved
+        self.bulk_max_concurrency = bulk_max_concurrency
+
+        self.active = 0
+        self.active_bulk = 0
+        self._waiters: dict[Lane, deque[asyncio.Future]] = {
+            lane: deque() for lane in LANES
+        }
+
+    def queued(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _can_run(self, lane: Lane) -> bool:
+        if lane == Lane.critical:
+            return self.active < self.max_concurrency
+        if self.active >= self.max_concurrency - self.critical_reserved:
+            return False
+        if lane == Lane.bulk and self.bulk_max_concurrency is not None:
+            return self.active_bulk < self.bulk_max_concurrency
+        return True
+
+    def _take(self, lane: Lane) -> None:
+        self.active += 1
+        if lane == Lane.bulk:
+            self.active_bulk += 1
+
+    def _has_priority_waiters(self, lane: Lane) -> bool:
+        return any(self._waiters[other] for other in LANES[: LANES.index(lane) + 1])
+
+    async def acquire(self, lane: Lane) -> None:
+        if not self._has_priority_waiters(lane) and self._can_run(lane):
+            self._take(lane)
+            return
+
+        if self.queued() >= self.max_queue and not self._evict_below(lane):
+            raise Overloaded("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append(waiter)
+        started = perf_counter()
+        try:
+            async with asyncio.timeout(self.max_queue_wait):
+                await waiter
+        except BaseException as e:
+            granted = (
+                waiter.done() and not waiter.cancelled() and waiter.exception() is None
+            )
+            # The slot may have been handed over just as the wait timed out.
+            if granted and isinstance(e, TimeoutError):
+                return
+            if granted:
+                self.release(lane)
+            waiter.cancel()
+            if isinstance(e, TimeoutError):
+                raise Overloaded("queue_timeout")
+            raise
+        finally:
+            try:
+                self._waiters[lane].remove(waiter)
+            except ValueError:
+                pass
+            queue_wait_seconds.observe(perf_counter() - started, lane.value)
+
+    def release(self, lane: Lane) -> None:
+        self.active -= 1
+        if lane == Lane.bulk:
+            self.active_bulk -= 1
+
+        for lane in LANES:
+            waiters = self._waiters[lane]
+            while waiters and self._can_run(lane):
+                waiter = waiters.popleft()
+                if waiter.done():
+                    continue
+                self._take(lane)
+                waiter.set_result(None)
+
+    def _evict_below(self, lane: Lane) -> bool:
+        # A full queue makes room for more important work by shedding the
+        # newest waiter from the least important lane.
+        for other in reversed(LANES[LANES.index(lane) + 1 :]):
+            waiters = self._waiters[other]
+            while waiters:
+                waiter = waiters.pop()
+                if not waiter.done():
+                    waiter.set_exception(Overloaded("evicted"))
+                    return True
+        return False
+
+
+admission_controller = AdmissionController(
+    max_concurrency=settings.ADMISSION_MAX_CONCURRENCY,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    max_queue_wait=settings.ADMISSION_MAX_QUEUE_WAIT_MS / 1000,
+    critical_reserved=settings.ADMISSION_CRITICAL_RESERVED,
+    bulk_max_concurrency=settings.ADMISSION_BULK_MAX_CONCURRENCY,
+)
+
+Gauge(
+    "http_admission_active_requests",
+    "Requests currently holding an admission slot.",
+    function=lambda: admission_controller.active,
+)
+Gauge(
+    "http_admission_queued_requests",
+    "Requests waiting for an admission slot.",
+    function=admission_controller.queued,
+)
+
+
+class AdmissionMiddleware:
+    def __init__(
+        self, app: ASGIApp, controller: AdmissionController = admission_controller
+    ):
+        self.app = app
+        self.controller = controller
+        self.critical_routes = {
+            tuple(route.split(" ", 1)) for route in settings.ADMISSION_CRITICAL_ROUTES
+        }
+        self.bulk_prefixes = tuple(settings.ADMISSION_BULK_PATH_PREFIXES)
+        self.exempt_paths = set(settings.ADMISSION_EXEMPT_PATHS)
+
+    def lane(self, scope: Scope) -> Lane | None:
+        path = scope["path"].rstrip("/") or "/"
+        if path in self.exempt_paths:
+            return None
+        if (scope["method"], path) in self.critical_routes:
+            return Lane.critical
+        if path.startswith(self.bulk_prefixes):
+            return Lane.bulk
+        return Lane.default
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        lane = self.lane(scope)
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(lane)
+        except Overloaded as e:
+            requests_shed.inc(lane.value, str(e))
+            response = JSONResponse(
+                {"detail": "Service is overloaded, try again later"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(lane)
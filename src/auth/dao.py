@@ -1,12 +1,81 @@
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from .models import RefreshSessionModel
 from .schemas import (
     RefreshSessionCreate,
     RefreshSessionUpdate,
 )
 from ..dao import BaseDAO
+from ..users.models import UserModel
 
 
 class RefreshSessionDAO(
     BaseDAO[RefreshSessionModel, RefreshSessionCreate, RefreshSessionUpdate]
 ):
     model = RefreshSessionModel
+
+    @classmethod
+    async def rotate(
+        cls, session: AsyncSession, token: UUID, object_in: RefreshSessionUpdate
+    ) -> UUID | None:
+        # The row lock taken by the UPDATE makes a concurrent rotation of the same
+        # token re-check the WHERE clause and match nothing.
+        result = await session.execute(
+            update(cls.model)
+            .where(
+                cls.model.refresh_token == token,
+                cls.model.expires_at > func.now(),
+                cls.model.user_id == UserModel.id,
+                UserModel.is_active.is_(True),
+            )
+            .values(**object_in.model_dump(exclude_unset=True))
+            .returning(cls.model.user_id)
+        )
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def delete_expired_token(cls, session: AsyncSession, token: UUID) -> bool:
+        result = await session.execute(
+            delete(cls.model).where(
+                cls.model.refresh_token == token,
+                cls.model.expires_at <= func.now(),
+            )
+        )
+        return result.rowcount > 0
+
+    @classmethod
+    async def delete_expired(cls, session: AsyncSession, batch_size: int) -> int:
+        # SKIP LOCKED lets concurrent pruners (one per worker) split the work
+        # instead of queueing behind each other.
+        expired = (
+            select(cls.model.id)
+            .where(cls.model.expires_at <= func.now())
+            .order_by(cls.model.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        result = await session.execute(
+            delete(cls.model).where(cls.model.id.in_(expired.scalar_subquery()))
+        )
+        return result.rowcount
+
+    @classmethod
+    async def delete_oldest_over_limit(
+        cls, session: AsyncSession, user_id: UUID, keep: int
+    ) -> int:
+        newest = (
+            select(cls.model.id)
+            .where(cls.model.user_id == user_id)
+            .order_by(cls.model.id.desc())
+            .limit(keep)
+        )
+        result = await session.execute(
+            delete(cls.model).where(
+                cls.model.user_id == user_id,
+                cls.model.id.not_in(newest.scalar_subquery()),
+            )
+        )
+        return result.rowcount
@@ -1,8 +1,8 @@
 from uuid import UUID
 
-from jose import jwt
 from fastapi import Depends
 
+from ..dependencies import RequestSession
 from ..users.models import UserModel
 from ..users.service import UserService
 from ..exceptions import NotEnoughPrivileges
@@ -10,7 +10,7 @@ from .exceptions import (
     InvalidToken,
     InactiveUser,
 )
-from ..config import settings
+from .tokens import decode_access_token
 from .utils import CookieToken
 
 cookie_token = CookieToken()
@@ -18,24 +18,22 @@ cookie_token = CookieToken()
 
 async def get_current_user_id(token: str = Depends(cookie_token)) -> str | None:
     if token:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_access_token(token)
         return payload.get("sub")
     return None
 
 
-async def get_current_user(token: str = Depends(cookie_token)) -> UserModel | None:
+async def get_current_user(
+    session: RequestSession, token: str = Depends(cookie_token)
+) -> UserModel | None:
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+        payload = decode_access_token(token)
         user_id = payload.get("sub")
         if user_id is None:
             raise InvalidToken
     except Exception:
         raise InvalidToken
-    current_user = await UserService.get_user(UUID(user_id))
+    current_user = await UserService.get_user(UUID(user_id), session)
     return current_user
 
 
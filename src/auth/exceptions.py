@@ -37,3 +37,12 @@ class NotAuthenticated(HTTPException):
             detail="Not authenticated",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+
+class PasswordHashingOverloaded(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many authentication requests, try again later",
+            headers={"Retry-After": "1"},
+        )
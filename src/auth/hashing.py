@@ -0,0 +1,92 @@
+import asyncio
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+from typing import Callable, Literal, TypeVar
+
+from ..config import settings
+from ..monitoring.metrics import Counter, Gauge, Histogram
+from .exceptions import PasswordHashingOverloaded
+from .utils import get_password_hash, is_valid_password
+
+
+ResultType = TypeVar("ResultType")
+
+hash_duration_seconds = Histogram(
+    "password_hasher_duration_seconds",
+    "Time to hash or verify a password, including the wait for a worker.",
+    labelnames=("operation",),
+)
+hash_rejected = Counter(
+    "password_hasher_rejected",
+    "Password hashing calls rejected because the queue was full.",
+    labelnames=("operation",),
+)
+
+
+class PasswordHasher:
+    def __init__(
+        self,
+        executor: Literal["thread", "process"] = "thread",
+        max_workers: int = 4,
+        max_pending: int = 64,
+    ):
+        self.executor_type = executor
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+
+        self._executor: Executor | None = None
+        self._in_flight = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            "verify", is_valid_password, plain_password, hashed_password
+        )
+
+    async def _run(
+        self, operation: str, func: Callable[..., ResultType], *args
+    ) -> ResultType:
+        if self._in_flight >= self.max_workers + self.max_pending:
+            hash_rejected.inc(operation)
+            raise PasswordHashingOverloaded
+
+        self._in_flight += 1
+        started = perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_flight -= 1
+            hash_duration_seconds.observe(perf_counter() - started, operation)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor=settings.PASSWORD_HASHER_EXECUTOR,
+    max_workers=settings.PASSWORD_HASHER_WORKERS,
+    max_pending=settings.PASSWORD_HASHER_MAX_PENDING,
+)
+
+Gauge(
+    "password_hasher_in_flight",
+    "Password hashing calls running or waiting for a worker.",
+    function=lambda: password_hasher._in_flight,
+)
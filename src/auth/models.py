@@ -1,6 +1,7 @@
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import DateTime, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.dialects.postgresql import UUID as pgUUID
 
@@ -13,6 +14,7 @@ class RefreshSessionModel(Base):
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     refresh_token: Mapped[UUID] = mapped_column(pgUUID, index=True)
     expires_in: Mapped[int] = mapped_column()
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), index=True)
     user_id: Mapped[UUID] = mapped_column(
-        pgUUID, ForeignKey("users.id", ondelete="CASCADE")
+        pgUUID, ForeignKey("users.id", ondelete="CASCADE"), index=True
     )
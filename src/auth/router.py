@@ -3,6 +3,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, Response, Request, status
 
 from src.database import Message
+from src.dependencies import RequestSession
 from ..users.schemas import UserCreate, User
 from ..users.service import UserService
 from .schemas import Token, LoginData
@@ -15,20 +16,23 @@ auth_router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @auth_router.post("/register", status_code=status.HTTP_201_CREATED, response_model=User)
-async def register(user: UserCreate) -> User:
-    return await UserService.register_new_user(user)
+async def register(user: UserCreate, session: RequestSession) -> User:
+    return await UserService.register_new_user(user, session)
 
 
 @auth_router.post("/login", response_model=Token)
 async def login(
     credentials: LoginData,
     response: Response,
+    session: RequestSession,
 ) -> Token:
-    user = await AuthService.authenticate_user(credentials.email, credentials.password)
+    user = await AuthService.authenticate_user(
+        credentials.email, credentials.password, session
+    )
     if not user:
         raise InvalidCredentials
 
-    token = await AuthService.create_token(user.id)
+    token = await AuthService.create_token(user.id, session)
 
     response.set_cookie(
         "access_token",
@@ -50,13 +54,15 @@ async def login(
     dependencies=[Depends(get_current_active_user)],
     response_model=Message,
 )
-async def logout(request: Request, response: Response) -> Message:
+async def logout(
+    request: Request, response: Response, session: RequestSession
+) -> Message:
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
 
     refresh_token = request.cookies.get("refresh_token")
     if refresh_token:
-        await AuthService.logout(UUID(refresh_token))
+        await AuthService.logout(UUID(refresh_token), session)
 
     return Message(message="Logged out successfully")
 
@@ -94,10 +100,12 @@ async def refresh_token(
 
 @auth_router.post("/abort", response_model=Message)
 async def abort_all_sessions(
-    response: Response, user: User = Depends(get_current_user)
+    response: Response,
+    session: RequestSession,
+    user: User = Depends(get_current_user),
 ) -> Message:
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
 
-    await AuthService.abort_all_sessions(user.id)
+    await AuthService.abort_all_sessions(user.id, session)
     return Message(message="All sessions was aborted")
@@ -1,3 +1,4 @@
+from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel, Field, EmailStr
@@ -6,6 +7,7 @@ from pydantic import BaseModel, Field, EmailStr
 class RefreshSessionCreate(BaseModel):
     refresh_token: UUID
     expires_in: int
+    expires_at: datetime
     user_id: UUID
 
 
@@ -1,9 +1,11 @@
+from time import perf_counter
 from uuid import UUID, uuid4
 from datetime import datetime, timedelta, timezone
 
 from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .utils import is_valid_password
+from .hashing import password_hasher
 from .schemas import (
     RefreshSessionCreate,
     RefreshSessionUpdate,
@@ -14,26 +16,49 @@ from ..users.dao import UserDAO
 from .models import RefreshSessionModel
 from .dao import RefreshSessionDAO
 from .exceptions import InvalidToken, TokenExpired
-from ..database import async_session_maker
+from ..database import async_session_maker, session_scope
 from ..config import settings
+from ..monitoring.metrics import Counter, Histogram
+
+
+sessions_pruned = Counter(
+    "auth_refresh_sessions_pruned",
+    "Expired refresh sessions deleted by the pruning task.",
+)
+sessions_evicted = Counter(
+    "auth_refresh_sessions_evicted",
+    "Refresh sessions deleted to keep users under MAX_SESSIONS_PER_USER.",
+)
+prune_duration_seconds = Histogram(
+    "auth_refresh_session_prune_duration_seconds",
+    "Duration of refresh session pruning runs.",
+)
 
 
 class AuthService:
     @classmethod
-    async def create_token(cls, user_id: UUID) -> Token:
+    async def create_token(
+        cls, user_id: UUID, session: AsyncSession | None = None
+    ) -> Token:
         access_token = cls._create_access_token(user_id)
         refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
         refresh_token = cls._create_refresh_token()
 
-        async with async_session_maker() as session:
+        async with session_scope(session) as session:
             await RefreshSessionDAO.add(
                 session,
                 RefreshSessionCreate(
                     user_id=user_id,
                     refresh_token=refresh_token,
                     expires_in=refresh_token_expires.total_seconds(),
+                    expires_at=datetime.now(timezone.utc) + refresh_token_expires,
                 ),
             )
+            if settings.MAX_SESSIONS_PER_USER > 0:
+                evicted = await RefreshSessionDAO.delete_oldest_over_limit(
+                    session, user_id, keep=settings.MAX_SESSIONS_PER_USER
+                )
+                sessions_evicted.inc(amount=evicted)
             await session.commit()
         return Token(
             access_token=f"Bearer {access_token}",
@@ -42,8 +67,8 @@ class AuthService:
         )
 
     @classmethod
-    async def logout(cls, token: UUID) -> None:
-        async with async_session_maker() as session:
+    async def logout(cls, token: UUID, session: AsyncSession | None = None) -> None:
+        async with session_scope(session) as session:
             refresh_session = await RefreshSessionDAO.find_one_or_none(
                 session, RefreshSessionModel.refresh_token == token
             )
@@ -53,60 +78,77 @@ class AuthService:
 
     @classmethod
     async def refresh_token(cls, token: UUID) -> Token:
-        async with async_session_maker() as session:
-            refresh_session = await RefreshSessionDAO.find_one_or_none(
-                session, RefreshSessionModel.refresh_token == token
-            )
-
-            if refresh_session is None:
-                raise InvalidToken
-            if datetime.now(timezone.utc) >= refresh_session.created_at + timedelta(
-                seconds=refresh_session.expires_in
-            ):
-                await RefreshSessionDAO.delete(session, id=refresh_session.id)
-                raise TokenExpired
-
-            user = await UserDAO.find_one_or_none(session, id=refresh_session.user_id)
-            if user is None:
-                raise InvalidToken
-
-            access_token = cls._create_access_token(user.id)
-            refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-            refresh_token = cls._create_refresh_token()
+        refresh_token_expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        refresh_token = cls._create_refresh_token()
 
-            await RefreshSessionDAO.update(
+        async with async_session_maker() as session:
+            user_id = await RefreshSessionDAO.rotate(
                 session,
-                RefreshSessionModel.id == refresh_session.id,
-                object_in=RefreshSessionUpdate(
+                token,
+                RefreshSessionUpdate(
                     refresh_token=refresh_token,
                     expires_in=refresh_token_expires.total_seconds(),
+                    expires_at=datetime.now(timezone.utc) + refresh_token_expires,
                 ),
             )
+            if user_id is None:
+                # Only the failure path pays for a second statement, to tell an
+                # expired session apart from an unknown token.
+                expired = await RefreshSessionDAO.delete_expired_token(session, token)
+                await session.commit()
+                raise TokenExpired if expired else InvalidToken
             await session.commit()
+
+        access_token = cls._create_access_token(user_id)
         return Token(
             access_token=access_token, refresh_token=refresh_token, token_type="bearer"
         )
 
     @classmethod
-    async def authenticate_user(cls, email: str, password: str) -> User | None:
-        async with async_session_maker() as session:
+    async def authenticate_user(
+        cls, email: str, password: str, session: AsyncSession | None = None
+    ) -> User | None:
+        async with session_scope(session) as session:
             db_user = await UserDAO.find_one_or_none(session, email=email)
+            # Hand the connection back to the pool while bcrypt runs.
+            await session.commit()
         if (
             db_user
             and db_user.is_active
-            and is_valid_password(password, db_user.hashed_password)
+            and await password_hasher.verify(password, db_user.hashed_password)
         ):
             return db_user
         return None
 
     @classmethod
-    async def abort_all_sessions(cls, user_id: UUID):
-        async with async_session_maker() as session:
+    async def abort_all_sessions(
+        cls, user_id: UUID, session: AsyncSession | None = None
+    ):
+        async with session_scope(session) as session:
             await RefreshSessionDAO.delete(
                 session, RefreshSessionModel.user_id == user_id
             )
             await session.commit()
 
+    @classmethod
+    async def prune_expired_sessions(cls) -> int:
+        started = perf_counter()
+        removed = 0
+        # Small batches in separate transactions keep row locks short-lived.
+        while True:
+            async with async_session_maker() as session:
+                deleted = await RefreshSessionDAO.delete_expired(
+                    session, batch_size=settings.REFRESH_SESSION_PRUNE_BATCH_SIZE
+                )
+                await session.commit()
+            removed += deleted
+            if deleted < settings.REFRESH_SESSION_PRUNE_BATCH_SIZE:
+                break
+
+        sessions_pruned.inc(amount=removed)
+        prune_duration_seconds.observe(perf_counter() - started)
+        return removed
+
     @classmethod
     def _create_access_token(cls, user_id: UUID) -> str:
         to_encode = {
@@ -0,0 +1,46 @@
+from time import time
+from typing import Any
+
+from jose import jwt
+
+from ..cache import TTLCache
+from ..config import settings
+from ..monitoring.metrics import Counter, Gauge
+
+
+# Verified claims keyed by the encoded token. Each entry lives only until the
+# token's own exp, so an expired token always goes back through jwt.decode and
+# fails there.
+token_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    maxsize=settings.TOKEN_CACHE_MAXSIZE,
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
+
+Counter(
+    "auth_token_cache_hits",
+    "Access tokens served from the verified-token cache.",
+    function=lambda: token_cache.hits,
+)
+Counter(
+    "auth_token_cache_misses",
+    "Access tokens that needed signature verification.",
+    function=lambda: token_cache.misses,
+)
+Gauge(
+    "auth_token_cache_size",
+    "Verified tokens currently cached.",
+    function=lambda: len(token_cache),
+)
+
+
+def decode_access_token(token: str) -> dict[str, Any]:
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    expires_at = claims.get("exp")
+    ttl = expires_at - time() if expires_at is not None else None
+    if ttl is None or ttl > 0:
+        token_cache.set(token, claims, ttl=ttl)
+    return claims
@@ -0,0 +1,31 @@
+import asyncio
+import logging
+
+from time import perf_counter
+
+from .bookings.service import BookingService
+
+from .auth.models import RefreshSessionModel
+from .users.models import UserModel
+from .rooms.models import RoomModel
+from .bookings.models import BookingModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def backfill_occupancy():
+    logger.info("Rebuilding room_day_occupancy from bookings...")
+
+    started = perf_counter()
+    inserted = await BookingService.backfill_occupancy()
+
+    logger.info(
+        "Occupancy backfill completed: %s room-days in %.1f s",
+        inserted,
+        perf_counter() - started,
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill_occupancy())
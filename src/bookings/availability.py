@@ -0,0 +1,192 @@
+from bisect import bisect_left
+from datetime import date
+from typing import Iterable
+from uuid import UUID
+
+from ..monitoring.metrics import Gauge
+
+
+class RoomIntervals:
+    def __init__(self):
+        self.starts: list[date] = []
+        self.ends: list[date] = []
+        self.booking_ids: list[UUID] = []
+        # max_ends[i] is the latest date_to among the first i + 1 intervals, which
+        # keeps lookups correct even if legacy rows overlap each other.
+        self.max_ends: list[date] = []
+
+    def add(self, booking_id: UUID, date_from: date, date_to: date) -> None:
+        position = bisect_left(self.starts, date_from)
+        self.starts.insert(position, date_from)
+        self.ends.insert(position, date_to)
+        self.booking_ids.insert(position, booking_id)
+        self.max_ends.insert(position, date_to)
+        self._rebuild_max_ends(position)
+
+    def remove(self, booking_id: UUID) -> None:
+        position = self.booking_ids.index(booking_id)
+        del self.starts[position]
+        del self.ends[position]
+        del self.booking_ids[position]
+        del self.max_ends[position]
+        self._rebuild_max_ends(position)
+
+    def overlaps(self, date_from: date, date_to: date) -> bool:
+        position = bisect_left(self.starts, date_to)
+        return position > 0 and self.max_ends[position - 1] > date_from
+
+    def intervals(self, date_from: date, date_to: date) -> list[tuple[date, date]]:
+        result = []
+        position = bisect_left(self.starts, date_to) - 1
+        while position >= 0 and self.max_ends[position] > date_from:
+            if self.ends[position] > date_from:
+                result.append((self.starts[position], self.ends[position]))
+            position -= 1
+        result.reverse()
+        return result
+
+    def _rebuild_max_ends(self, position: int) -> None:
+        current = self.max_ends[position - 1] if position > 0 else None
+        for index in range(position, len(self.ends)):
+            if current is None or self.ends[index] > current:
+                current = self.ends[index]
+            self.max_ends[index] = current
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+
+class AvailabilityIndex:
+    def __init__(self):
+        self._rooms: dict[UUID, RoomIntervals] = {}
+        self._bookings: dict[UUID, UUID] = {}
+        self._journal: list[tuple] | None = None
+
+        self.loaded = False
+        self.horizon: date | None = None
+
+    def covers(self, date_from: date) -> bool:
+        return self.loaded and self.horizon is not None and date_from >= self.horizon
+
+    def begin_load(self) -> None:
+        self._journal = []
+
+    def cancel_load(self) -> None:
+        self._journal = None
+
+    def load(
+        self,
+        horizon: date,
+        rows: Iterable[tuple[UUID, UUID, date, date]],
+    ) -> None:
+        rooms: dict[UUID, RoomIntervals] = {}
+        bookings: dict[UUID, UUID] = {}
+
+        for booking_id, room_id, date_from, date_to in rows:
+            intervals = rooms.get(room_id)
+            if intervals is None:
+                intervals = rooms[room_id] = RoomIntervals()
+            intervals.starts.append(date_from)
+            intervals.ends.append(date_to)
+            intervals.booking_ids.append(booking_id)
+            intervals.max_ends.append(date_to)
+            bookings[booking_id] = room_id
+
+        for intervals in rooms.values():
+            order = sorted(range(len(intervals)), key=intervals.starts.__getitem__)
+            intervals.starts = [intervals.starts[i] for i in order]
+            intervals.ends = [intervals.ends[i] for i in order]
+            intervals.booking_ids = [intervals.booking_ids[i] for i in order]
+            intervals._rebuild_max_ends(0)
+
+        journal, self._journal = self._journal or [], None
+        self._rooms = rooms
+        self._bookings = bookings
+        self.horizon = horizon
+        self.loaded = True
+
+        # Changes made while the snapshot was being read are replayed on top.
+        for operation, *args in journal:
+            getattr(self, operation)(*args)
+
+    def add(
+        self, booking_id: UUID, room_id: UUID, date_from: date, date_to: date
+    ) -> None:
+        if self._journal is not None:
+            self._journal.append(("add", booking_id, room_id, date_from, date_to))
+        if not self.loaded:
+            return
+
+        self.remove(booking_id)
+        if self.horizon is not None and date_to <= self.horizon:
+            return
+
+        intervals = self._rooms.get(room_id)
+        if intervals is None:
+            intervals = self._rooms[room_id] = RoomIntervals()
+        intervals.add(booking_id, date_from, date_to)
+        self._bookings[booking_id] = room_id
+
+    def remove(self, booking_id: UUID) -> None:
+        if self._journal is not None:
+            self._journal.append(("remove", booking_id))
+
+        room_id = self._bookings.pop(booking_id, None)
+        if room_id is None:
+            return
+
+        intervals = self._rooms[room_id]
+        intervals.remove(booking_id)
+        if not intervals:
+            del self._rooms[room_id]
+
+    def remove_room(self, room_id: UUID) -> None:
+        if self._journal is not None:
+            self._journal.append(("remove_room", room_id))
+
+        intervals = self._rooms.pop(room_id, None)
+        if intervals is None:
+            return
+        for booking_id in intervals.booking_ids:
+            self._bookings.pop(booking_id, None)
+
+    def is_free(self, room_id: UUID, date_from: date, date_to: date) -> bool:
+        intervals = self._rooms.get(room_id)
+        return intervals is None or not intervals.overlaps(date_from, date_to)
+
+    def booked_rooms(self, date_from: date, date_to: date) -> list[UUID]:
+        return [
+            room_id
+            for room_id, intervals in self._rooms.items()
+            if intervals.overlaps(date_from, date_to)
+        ]
+
+    def booked_intervals(
+        self, room_id: UUID, date_from: date, date_to: date
+    ) -> list[tuple[date, date]]:
+        intervals = self._rooms.get(room_id)
+        if intervals is None:
+            return []
+        return intervals.intervals(date_from, date_to)
+
+    def stats(self) -> dict[str, int]:
+        return {"rooms": len(self._rooms), "bookings": len(self._bookings)}
+
+
+availability_index = AvailabilityIndex()
+
+Gauge(
+    "availability_index_loaded",
+    "Whether the availability index is loaded and serving lookups.",
+    function=lambda: int(availability_index.loaded),
+)
+Gauge(
+    "availability_index_rooms",
+    "Rooms with upcoming bookings held in the availability index.",
+    function=lambda: availability_index.stats()["rooms"],
+)
+Gauge(
+    "availability_index_bookings",
+    "Upcoming bookings held in the availability index.",
+    function=lambda: availability_index.stats()["bookings"],
+)
@@ -1,4 +1,26 @@
-from .models import BookingModel
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    Integer,
+    any_,
+    bindparam,
+    cast,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as pgUUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .availability import RoomIntervals
+from .models import BookingModel, room_day_occupancy
 from .schemas import BookingCreate, BookingUpdate
 
 from ..dao import BaseDAO
@@ -6,3 +28,180 @@ from ..dao import BaseDAO
 
 class BookingDAO(BaseDAO[BookingModel, BookingCreate, BookingUpdate]):
     model = BookingModel
+
+    @classmethod
+    async def add_strict(
+        cls,
+        session: AsyncSession,
+        object_in: BookingCreate,
+    ) -> BookingModel:
+        statement = (
+            insert(cls.model)
+            .values(**object_in.model_dump(exclude_unset=True))
+            .returning(cls.model)
+        )
+        result = await session.execute(statement)
+        return result.scalars().one()
+
+    @classmethod
+    async def delete_returning_user(
+        cls, session: AsyncSession, booking_id: UUID
+    ) -> UUID | None:
+        statement = (
+            delete(cls.model)
+            .where(cls.model.id == booking_id)
+            .returning(cls.model.user_id)
+        )
+        result = await session.execute(statement)
+        return result.scalar_one_or_none()
+
+    @classmethod
+    async def find_intervals(cls, session: AsyncSession, *filter) -> list[tuple]:
+        statement = select(
+            cls.model.id,
+            cls.model.room_id,
+            cls.model.date_from,
+            cls.model.date_to,
+        ).filter(*filter)
+        result = await session.execute(statement)
+        return result.all()
+
+    @classmethod
+    async def sync_occupancy(
+        cls, session: AsyncSession, booking_ids: list[UUID]
+    ) -> None:
+        if booking_ids:
+            await cls._rebuild_occupancy(
+                session,
+                room_day_occupancy.c.booking_id
+                == any_(literal(booking_ids, ARRAY(pgUUID))),
+                cls.model.id == any_(literal(booking_ids, ARRAY(pgUUID))),
+            )
+
+    @classmethod
+    async def rebuild_room_occupancy(
+        cls, session: AsyncSession, room_ids: list[UUID]
+    ) -> int:
+        return await cls._rebuild_occupancy(
+            session,
+            room_day_occupancy.c.room_id == any_(literal(room_ids, ARRAY(pgUUID))),
+            cls.model.room_id == any_(literal(room_ids, ARRAY(pgUUID))),
+        )
+
+    @classmethod
+    async def _rebuild_occupancy(
+        cls, session: AsyncSession, occupancy_filter, booking_filter
+    ) -> int:
+        await session.execute(delete(room_day_occupancy).where(occupancy_filter))
+
+        nights = func.generate_series(
+            cls.model.date_from,
+            cls.model.date_to - 1,
+            literal_column("interval '1 day'"),
+        )
+        statement = insert(room_day_occupancy).from_select(
+            ["day", "room_id", "booking_id"],
+            select(cast(nights, Date), cls.model.room_id, cls.model.id).where(
+                booking_filter
+            ),
+        )
+        result = await session.execute(statement)
+        return result.rowcount
+
+    @classmethod
+    async def find_occupancy(
+        cls,
+        session: AsyncSession,
+        date_from: date,
+        date_to: date,
+        granularity: str,
+        room_ids: list[UUID] | None = None,
+    ) -> list[tuple]:
+        period = cast(
+            func.date_trunc(granularity, cast(room_day_occupancy.c.day, DateTime)),
+            Date,
+        ).label("period")
+        columns = [period]
+        filters = [
+            room_day_occupancy.c.day >= date_from,
+            room_day_occupancy.c.day < date_to,
+        ]
+        if room_ids is not None:
+            columns.insert(0, room_day_occupancy.c.room_id)
+            filters.append(
+                room_day_occupancy.c.room_id == any_(literal(room_ids, ARRAY(pgUUID)))
+            )
+
+        statement = (
+            select(*columns, func.count().label("occupied"))
+            .where(*filters)
+            .group_by(*columns)
+        )
+        result = await session.execute(statement)
+        return result.all()
+
+    @classmethod
+    async def merge_staging(
+        cls, session: AsyncSession, staging_table: str
+    ) -> list[tuple[int, str]]:
+        statement = text(
+            f"""
+            SELECT
+                ordinal,
+                id,
+                room_id,
+                date_from,
+                date_to,
+                CASE
+                    WHEN NOT EXISTS (
+                        SELECT 1 FROM rooms WHERE rooms.id = staging.room_id
+                    ) THEN 'Room not found'
+                    WHEN NOT EXISTS (
+                        SELECT 1 FROM users WHERE users.id = staging.user_id
+                    ) THEN 'User not found'
+                    WHEN EXISTS (
+                        SELECT 1 FROM bookings
+                        WHERE bookings.room_id = staging.room_id
+                        AND daterange(bookings.date_from, bookings.date_to)
+                            && daterange(staging.date_from, staging.date_to)
+                    ) THEN 'Booking already exists'
+                END AS error
+            FROM {staging_table} AS staging
+            ORDER BY ordinal
+            """
+        )
+        result = await session.execute(statement)
+
+        # A staged row only conflicts with earlier rows that are actually
+        # inserted, so overlaps within the import are resolved in request order
+        # against the rows accepted so far.
+        errors = []
+        rooms: dict[UUID, RoomIntervals] = {}
+        for ordinal, booking_id, room_id, date_from, date_to, error in result.all():
+            intervals = rooms.setdefault(room_id, RoomIntervals())
+            if error is None and intervals.overlaps(date_from, date_to):
+                error = "Booking overlaps an earlier booking in import"
+            if error is None:
+                intervals.add(booking_id, date_from, date_to)
+            else:
+                errors.append((ordinal, error))
+
+        if errors:
+            await session.execute(
+                text(
+                    f"DELETE FROM {staging_table} WHERE ordinal = ANY(:rejected)"
+                ).bindparams(
+                    bindparam(
+                        "rejected",
+                        [ordinal for ordinal, _ in errors],
+                        type_=ARRAY(Integer),
+                    )
+                )
+            )
+        await session.execute(
+            text(
+                "INSERT INTO bookings (id, user_id, room_id, date_from, date_to) "
+                f"SELECT id, user_id, room_id, date_from, date_to FROM {staging_table}"
+            )
+        )
+        return errors
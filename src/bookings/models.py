@@ -1,9 +1,18 @@
 from datetime import date
 from uuid import UUID, uuid4
 
-from sqlalchemy import ForeignKey, Date, UniqueConstraint
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    ForeignKey,
+    Date,
+    Index,
+    Table,
+    column,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID as pgUUID
+from sqlalchemy.dialects.postgresql import ExcludeConstraint, UUID as pgUUID
 
 from ..database import Base
 
@@ -11,7 +20,14 @@ from ..database import Base
 class BookingModel(Base):
     __tablename__ = "bookings"
     __table_args__ = (
-        UniqueConstraint("room_id", "date_from", "date_to", name="uq_room_booking"),
+        ExcludeConstraint(
+            ("room_id", "="),
+            (func.daterange(column("date_from"), column("date_to")), "&&"),
+            name="bookings_room_id_dates_excl",
+            using="gist",
+        ),
+        CheckConstraint("date_from < date_to", name="date_range"),
+        Index("bookings_user_id_created_at_id_idx", "user_id", "created_at", "id"),
     )
 
     id: Mapped[UUID] = mapped_column(
@@ -26,3 +42,27 @@ class BookingModel(Base):
 
     user = relationship("UserModel", back_populates="bookings")
     room = relationship("RoomModel", back_populates="bookings")
+
+
+# One row per booked night. A plain table rather than a Base model: the
+# created_at/modified_at pair would double the width of the narrowest and
+# largest table in the schema. The exclusion constraint on bookings
+# guarantees (day, room_id) is unique.
+room_day_occupancy = Table(
+    "room_day_occupancy",
+    Base.metadata,
+    Column("day", Date, primary_key=True),
+    Column(
+        "room_id",
+        pgUUID,
+        ForeignKey("rooms.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column(
+        "booking_id",
+        pgUUID,
+        ForeignKey("bookings.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    ),
+)
@@ -1,14 +1,20 @@
+from datetime import date
 from uuid import UUID
 
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Query, Path, status
+from fastapi.responses import StreamingResponse
 
+from src.bulk_import import BulkImportResult, BulkMode
 from src.database import Message
+from src.dependencies import RequestSession
+from src.export import EXPORT_MEDIA_TYPES, ExportFormat
+from src.pagination import CountMode
 from src.users.schemas import User
 
-from .schemas import Booking, BookingCreate, BookingUpdate, Bookings
-from .service import BookingService
+from .schemas import Booking, BookingCreate, BookingUpdate, Bookings, Occupancy
+from .service import BookingService, Granularity
 from ..auth.dependencies import get_current_active_user, get_current_superuser
 from ..exceptions import NotEnoughPrivileges
 
@@ -22,30 +28,63 @@ booking_router = APIRouter(prefix="/bookings", tags=["booking"])
 )
 async def add_booking(
     booking: BookingCreate,
+    session: RequestSession,
     current_user: User = Depends(get_current_active_user),
 ) -> Booking:
     booking.user_id = current_user.id
-    return await BookingService.add_booking(booking)
+    return await BookingService.add_booking(booking, session)
 
 
 @booking_router.post(
     "/bulk",
     status_code=status.HTTP_201_CREATED,
     dependencies=[Depends(get_current_superuser)],
-    response_model=list[Booking],
+    response_model=list[Booking] | BulkImportResult,
 )
 async def add_bookings(
     bookings: list[BookingCreate],
-) -> list[Booking]:
-    return await BookingService.add_bookings(bookings)
+    session: RequestSession,
+    mode: BulkMode = BulkMode.insert,
+) -> list[Booking] | BulkImportResult:
+    return await BookingService.add_bookings(bookings, mode, session)
+
+
+@booking_router.get("/export", dependencies=[Depends(get_current_superuser)])
+async def export_bookings(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> StreamingResponse:
+    return StreamingResponse(
+        BookingService.export_bookings(export_format, date_from, date_to),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename=bookings.{export_format.value}"
+        },
+    )
+
+
+@booking_router.get(
+    "/occupancy",
+    dependencies=[Depends(get_current_superuser)],
+    response_model=Occupancy,
+)
+async def get_occupancy(
+    date_from: date = Query(alias="from"),
+    date_to: date = Query(alias="to"),
+    granularity: Granularity = Granularity.month,
+    room_ids: Annotated[list[UUID] | None, Query(max_length=100)] = None,
+) -> Occupancy:
+    return await BookingService.get_occupancy(date_from, date_to, granularity, room_ids)
 
 
 @booking_router.get("/{booking_id}", response_model=Booking)
 async def get_booking(
+    session: RequestSession,
     booking_id: UUID = Path(...),
     current_user: User = Depends(get_current_active_user),
 ) -> Booking:
-    booking = await BookingService.get_booking(booking_id)
+    booking = await BookingService.get_booking(booking_id, session)
     if booking.user_id != current_user.id and not current_user.is_superuser:
         raise NotEnoughPrivileges
     return booking
@@ -53,12 +92,20 @@ async def get_booking(
 
 @booking_router.get("", response_model=Bookings)
 async def get_bookings(
+    session: RequestSession,
+    cursor: str | None = None,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(ge=1, le=100)] = 100,
+    count: CountMode = CountMode.exact,
     current_user: User = Depends(get_current_active_user),
 ) -> Bookings:
     return await BookingService.get_bookings(
-        offset=offset, limit=limit, user_id=current_user.id
+        cursor=cursor,
+        offset=offset,
+        limit=limit,
+        count=count,
+        user_id=current_user.id,
+        session=session,
     )
 
 
@@ -69,9 +116,10 @@ async def get_bookings(
 )
 async def update_booking(
     booking: BookingUpdate,
+    session: RequestSession,
     booking_id: UUID = Path(...),
 ) -> Booking:
-    return await BookingService.update_booking(booking_id, booking)
+    return await BookingService.update_booking(booking_id, booking, session)
 
 
 @booking_router.delete(
@@ -79,11 +127,12 @@ async def update_booking(
     response_model=Message,
 )
 async def delete_booking(
+    session: RequestSession,
     booking_id: UUID = Path(...),
     current_user: User = Depends(get_current_active_user),
 ) -> Message:
-    booking = await BookingService.get_booking(booking_id)
+    booking = await BookingService.get_booking(booking_id, session)
     if booking.user_id != current_user.id and not current_user.is_superuser:
         raise NotEnoughPrivileges
-    await BookingService.delete_booking(booking_id)
+    await BookingService.delete_booking(booking_id, session)
     return Message(message="Booking deleted successfully")
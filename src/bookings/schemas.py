@@ -1,7 +1,7 @@
 from datetime import date
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class BookingUpdate(BaseModel):
@@ -17,6 +17,12 @@ class BookingCreate(BookingUpdate):
     date_from: date
     date_to: date
 
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.date_from >= self.date_to:
+            raise ValueError("date_from must be earlier than date_to")
+        return self
+
 
 class Booking(BookingCreate):
     id: UUID
@@ -27,4 +33,24 @@ class Booking(BookingCreate):
 
 class Bookings(BaseModel):
     data: list[Booking]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
+
+
+class OccupancyPeriod(BaseModel):
+    date_from: date
+    date_to: date
+    room_days: int
+    occupied_room_days: int
+    rate: float
+
+
+class RoomOccupancy(BaseModel):
+    room_id: UUID
+    periods: list[OccupancyPeriod]
+
+
+class Occupancy(BaseModel):
+    rooms: int
+    periods: list[OccupancyPeriod]
+    by_room: list[RoomOccupancy] | None = None
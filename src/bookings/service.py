@@ -1,50 +1,217 @@
-from uuid import UUID
+from datetime import date, timedelta
+from enum import Enum
+from time import perf_counter
+from typing import AsyncIterator
+from uuid import UUID, uuid4
 
-from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.exceptions import EntityAlreadyExists, EntityNotFound
+from src.exceptions import (
+    EntityAlreadyExists,
+    EntityNotFound,
+    InvalidBookingDates,
+    InvalidDateRange,
+)
 
-from ..database import async_session_maker
-from .schemas import Booking, BookingCreate, BookingUpdate, Bookings
+from ..bulk_import import BulkImportError, BulkImportResult, BulkMode
+from ..config import settings
+from ..dao import get_violated_constraint
+from ..database import async_read_session_maker, async_session_maker, session_scope
+from ..export import ExportFormat, encode_rows
+from ..monitoring.metrics import Histogram
+from ..pagination import CountMode
+from ..rooms.dao import RoomDAO
+from .schemas import (
+    Booking,
+    BookingCreate,
+    BookingUpdate,
+    Bookings,
+    Occupancy,
+    OccupancyPeriod,
+    RoomOccupancy,
+)
 from .models import BookingModel
 from .dao import BookingDAO
+from .availability import availability_index
+
+
+availability_load_duration_seconds = Histogram(
+    "availability_index_load_duration_seconds",
+    "Duration of availability index reloads from the database.",
+)
+
+
+class Granularity(str, Enum):
+    day = "day"
+    week = "week"
+    month = "month"
+    quarter = "quarter"
+
+
+def _period_start(day: date, granularity: Granularity) -> date:
+    if granularity == Granularity.week:
+        return day - timedelta(days=day.weekday())
+    if granularity == Granularity.month:
+        return day.replace(day=1)
+    if granularity == Granularity.quarter:
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    return day
+
+
+def _next_period_start(start: date, granularity: Granularity) -> date:
+    if granularity == Granularity.week:
+        return start + timedelta(days=7)
+    if granularity in (Granularity.month, Granularity.quarter):
+        months = 1 if granularity == Granularity.month else 3
+        month = start.month - 1 + months
+        return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+    return start + timedelta(days=1)
+
+
+def _clip_periods(
+    date_from: date, date_to: date, granularity: Granularity
+) -> list[tuple[date, date]]:
+    # The first and last periods are clipped to the requested range, so they
+    # may be shorter than a full week, month or quarter.
+    periods = []
+    start = date_from
+    while start < date_to:
+        end = _next_period_start(_period_start(start, granularity), granularity)
+        periods.append((start, min(end, date_to)))
+        start = end
+    return periods
+
+
+def _occupancy_periods(
+    periods: list[tuple[date, date]],
+    occupied: dict[date, int],
+    rooms: int,
+    granularity: Granularity,
+) -> list[OccupancyPeriod]:
+    # Occupied counts are keyed by date_trunc of the night, i.e. the start of
+    # the unclipped period.
+    result = []
+    for start, end in periods:
+        room_days = (end - start).days * rooms
+        occupied_room_days = occupied.get(_period_start(start, granularity), 0)
+        result.append(
+            OccupancyPeriod(
+                date_from=start,
+                date_to=end,
+                room_days=room_days,
+                occupied_room_days=occupied_room_days,
+                rate=occupied_room_days / room_days if room_days else 0,
+            )
+        )
+    return result
 
 
 class BookingService:
     @classmethod
-    async def add_booking(cls, booking: BookingCreate) -> Booking:
-        async with async_session_maker() as session:
-            room_exists = await BookingDAO.find_one_or_none(
-                session,
-                BookingModel.id == booking.room_id
+    async def add_booking(
+        cls, booking: BookingCreate, session: AsyncSession | None = None
+    ) -> Booking:
+        async with session_scope(session) as session:
+            try:
+                db_booking = await BookingDAO.add_strict(session, booking)
+                await BookingDAO.sync_occupancy(session, [db_booking.id])
+                await session.commit()
+            except IntegrityError as e:
+                raise cls._constraint_error(e)
+        async_read_session_maker.stick(("bookings", db_booking.user_id))
+        availability_index.add(
+            db_booking.id,
+            db_booking.room_id,
+            db_booking.date_from,
+            db_booking.date_to,
+        )
+        return db_booking
+
+    @classmethod
+    async def add_bookings(
+        cls,
+        bookings: list[BookingCreate],
+        mode: BulkMode = BulkMode.insert,
+        session: AsyncSession | None = None,
+    ) -> list[Booking] | BulkImportResult:
+        if mode == BulkMode.copy:
+            return await cls.import_bookings(bookings, session)
+
+        async with session_scope(session) as session:
+            try:
+                db_bookings = await BookingDAO.add_bulk(session, bookings)
+                await BookingDAO.sync_occupancy(
+                    session, [db_booking.id for db_booking in db_bookings]
+                )
+                await session.commit()
+            except IntegrityError as e:
+                raise cls._constraint_error(e)
+        async_read_session_maker.stick(
+            *{("bookings", db_booking.user_id) for db_booking in db_bookings}
+        )
+        for db_booking in db_bookings:
+            availability_index.add(
+                db_booking.id,
+                db_booking.room_id,
+                db_booking.date_from,
+                db_booking.date_to,
+            )
+        return db_bookings
+
+    @classmethod
+    async def import_bookings(
+        cls, bookings: list[BookingCreate], session: AsyncSession | None = None
+    ) -> BulkImportResult:
+        records = [
+            (
+                uuid4(),
+                booking.user_id,
+                booking.room_id,
+                booking.date_from,
+                booking.date_to,
+                ordinal,
             )
-            if not room_exists:
-                raise EntityNotFound("room")
-            overlap = await BookingDAO.find_one_or_none(
+            for ordinal, booking in enumerate(bookings)
+        ]
+        async with session_scope(session) as session:
+            staging_table = await BookingDAO.copy_to_staging(
                 session,
-                and_(
-                    BookingModel.room_id == booking.room_id,
-                    BookingModel.date_from < booking.date_to,
-                    BookingModel.date_to > booking.date_from,
-                )
+                ["id", "user_id", "room_id", "date_from", "date_to"],
+                records,
+                batch_size=settings.BULK_IMPORT_BATCH_SIZE,
             )
-            if overlap:
-                raise EntityAlreadyExists("booking")
+            try:
+                errors = await BookingDAO.merge_staging(session, staging_table)
+                failed = {ordinal for ordinal, _ in errors}
+                await BookingDAO.sync_occupancy(
+                    session,
+                    [record[0] for record in records if record[-1] not in failed],
+                )
+                await session.commit()
+            except IntegrityError as e:
+                raise cls._constraint_error(e)
 
-            db_booking = await BookingDAO.add(session, booking)
-            await session.commit()
-        return db_booking
+        users = set()
+        for booking_id, user_id, room_id, date_from, date_to, ordinal in records:
+            if ordinal not in failed:
+                users.add(user_id)
+                availability_index.add(booking_id, room_id, date_from, date_to)
+        async_read_session_maker.stick(*{("bookings", user_id) for user_id in users})
 
-    @classmethod
-    async def add_bookings(cls, bookings: list[BookingCreate]) -> list[Booking]:
-        async with async_session_maker() as session:
-            db_bookings = await BookingDAO.add_bulk(session, bookings)
-            await session.commit()
-        return db_bookings
+        return BulkImportResult(
+            inserted=len(records) - len(errors),
+            errors=[
+                BulkImportError(index=ordinal, detail=detail)
+                for ordinal, detail in errors
+            ],
+        )
 
     @classmethod
-    async def get_booking(cls, booking_id: UUID) -> Booking:
-        async with async_session_maker() as session:
+    async def get_booking(
+        cls, booking_id: UUID, session: AsyncSession | None = None
+    ) -> Booking:
+        async with session_scope(session) as session:
             db_booking = await BookingDAO.find_one_or_none(session, id=booking_id)
         if db_booking is None:
             raise EntityNotFound("booking")
@@ -54,21 +221,36 @@ class BookingService:
     async def get_bookings(
         cls,
         user_id: UUID,
+        cursor: str | None = None,
         offset: int = 0,
         limit: int = 100,
+        count: CountMode = CountMode.exact,
+        session: AsyncSession | None = None,
     ) -> Bookings:
-        async with async_session_maker() as session:
-            bookings = await BookingDAO.find_all(
-                session, offset=offset, limit=limit, user_id=user_id
+        async with async_read_session_maker.scope(
+            session, ("bookings", user_id)
+        ) as session:
+            bookings, next_cursor, total = await BookingDAO.find_page(
+                session,
+                keyset=[BookingModel.created_at, BookingModel.id],
+                cursor=cursor,
+                offset=offset,
+                limit=limit,
+                count_mode=count,
+                user_id=user_id,
             )
-            if not bookings:
-                raise EntityNotFound("booking")
-            count = await BookingDAO.count(session, user_id=user_id)
-        return Bookings(data=bookings, count=count)
+        if not bookings:
+            raise EntityNotFound("booking")
+        return Bookings(data=bookings, count=total, next_cursor=next_cursor)
 
     @classmethod
-    async def update_booking(cls, booking_id: UUID, booking: BookingUpdate) -> Booking:
-        async with async_session_maker() as session:
+    async def update_booking(
+        cls,
+        booking_id: UUID,
+        booking: BookingUpdate,
+        session: AsyncSession | None = None,
+    ) -> Booking:
+        async with session_scope(session) as session:
             db_booking = await BookingDAO.find_one_or_none(
                 session, BookingModel.id == booking_id
             )
@@ -76,20 +258,189 @@ class BookingService:
                 raise EntityNotFound("booking")
 
             booking_in = booking.model_dump(exclude_unset=True)
-            booking_update = await BookingDAO.update(
-                session, BookingModel.id == booking_id, object_in=booking_in
-            )
-            await session.commit()
+            date_from = booking_in.get("date_from") or db_booking.date_from
+            date_to = booking_in.get("date_to") or db_booking.date_to
+            if date_from >= date_to:
+                raise InvalidBookingDates
+
+            try:
+                booking_update = await BookingDAO.update(
+                    session, BookingModel.id == booking_id, object_in=booking_in
+                )
+                await BookingDAO.sync_occupancy(session, [booking_id])
+                await session.commit()
+            except IntegrityError as e:
+                raise cls._constraint_error(e)
+        async_read_session_maker.stick(
+            ("bookings", db_booking.user_id), ("bookings", booking_update.user_id)
+        )
+        availability_index.add(
+            booking_update.id,
+            booking_update.room_id,
+            booking_update.date_from,
+            booking_update.date_to,
+        )
         return booking_update
 
     @classmethod
-    async def delete_booking(cls, booking_id: UUID) -> None:
+    async def delete_booking(
+        cls, booking_id: UUID, session: AsyncSession | None = None
+    ) -> None:
+        async with session_scope(session) as session:
+            user_id = await BookingDAO.delete_returning_user(session, booking_id)
+            await session.commit()
+        if user_id is not None:
+            async_read_session_maker.stick(("bookings", user_id))
+        availability_index.remove(booking_id)
+
+    @classmethod
+    async def sync_booking(cls, db_booking: BookingModel) -> None:
+        # For writes that bypass this service, such as the admin: rebuilds the
+        # booking's occupancy days, dropping its old range, and its entry in
+        # the availability index.
         async with async_session_maker() as session:
-            await BookingDAO.delete(session, BookingModel.id == booking_id)
+            await BookingDAO.sync_occupancy(session, [db_booking.id])
             await session.commit()
+        async_read_session_maker.stick(("bookings", db_booking.user_id))
+        availability_index.add(
+            db_booking.id,
+            db_booking.room_id,
+            db_booking.date_from,
+            db_booking.date_to,
+        )
+
+    @classmethod
+    def forget_booking(cls, db_booking: BookingModel) -> None:
+        # Occupancy rows are removed by the ON DELETE CASCADE on booking_id.
+        async_read_session_maker.stick(("bookings", db_booking.user_id))
+        availability_index.remove(db_booking.id)
 
     @classmethod
     async def count_bookings(cls) -> int:
         async with async_session_maker() as session:
             count = await BookingDAO.count(session)
         return count or 0
+
+    @classmethod
+    async def export_bookings(
+        cls,
+        export_format: ExportFormat,
+        date_from: date | None = None,
+        date_to: date | None = None,
+    ) -> AsyncIterator[bytes]:
+        filters = []
+        if date_from is not None:
+            filters.append(BookingModel.date_to > date_from)
+        if date_to is not None:
+            filters.append(BookingModel.date_from < date_to)
+
+        columns = [
+            BookingModel.id,
+            BookingModel.user_id,
+            BookingModel.room_id,
+            BookingModel.date_from,
+            BookingModel.date_to,
+            BookingModel.created_at,
+        ]
+        async with async_read_session_maker() as session:
+            partitions = BookingDAO.stream(
+                session,
+                *filters,
+                columns=columns,
+                batch_size=settings.EXPORT_BATCH_SIZE,
+            )
+            async for chunk in encode_rows(
+                partitions, [column.key for column in columns], export_format
+            ):
+                yield chunk
+
+    @classmethod
+    async def get_occupancy(
+        cls,
+        date_from: date,
+        date_to: date,
+        granularity: Granularity = Granularity.month,
+        room_ids: list[UUID] | None = None,
+    ) -> Occupancy:
+        if not 0 < (date_to - date_from).days <= settings.OCCUPANCY_MAX_DAYS:
+            raise InvalidDateRange(settings.OCCUPANCY_MAX_DAYS)
+
+        async with async_read_session_maker() as session:
+            if room_ids is None:
+                rooms = await RoomDAO.count(session) or 0
+            else:
+                room_ids = await RoomDAO.find_ids(session, room_ids)
+                rooms = len(room_ids)
+            rows = await BookingDAO.find_occupancy(
+                session, date_from, date_to, granularity.value, room_ids
+            )
+
+        periods = _clip_periods(date_from, date_to, granularity)
+        if room_ids is None:
+            return Occupancy(
+                rooms=rooms,
+                periods=_occupancy_periods(periods, dict(rows), rooms, granularity),
+            )
+
+        totals: dict[date, int] = {}
+        by_room: dict[UUID, dict[date, int]] = {room_id: {} for room_id in room_ids}
+        for room_id, period, occupied in rows:
+            by_room[room_id][period] = occupied
+            totals[period] = totals.get(period, 0) + occupied
+
+        return Occupancy(
+            rooms=rooms,
+            periods=_occupancy_periods(periods, totals, rooms, granularity),
+            by_room=[
+                RoomOccupancy(
+                    room_id=room_id,
+                    periods=_occupancy_periods(periods, occupied, 1, granularity),
+                )
+                for room_id, occupied in by_room.items()
+            ],
+        )
+
+    @classmethod
+    async def backfill_occupancy(cls) -> int:
+        async with async_session_maker() as session:
+            room_ids = await RoomDAO.find_all_ids(session)
+
+        inserted = 0
+        batch_size = settings.OCCUPANCY_BACKFILL_BATCH_ROOMS
+        for position in range(0, len(room_ids), batch_size):
+            async with async_session_maker() as session:
+                inserted += await BookingDAO.rebuild_room_occupancy(
+                    session, room_ids[position : position + batch_size]
+                )
+                await session.commit()
+        return inserted
+
+    @classmethod
+    async def load_availability(cls) -> None:
+        horizon = date.today()
+        started = perf_counter()
+
+        availability_index.begin_load()
+        try:
+            async with async_session_maker() as session:
+                rows = await BookingDAO.find_intervals(
+                    session, BookingModel.date_to > horizon
+                )
+        except Exception:
+            availability_index.cancel_load()
+            raise
+        availability_index.load(horizon, rows)
+        availability_load_duration_seconds.observe(perf_counter() - started)
+
+    @classmethod
+    def _constraint_error(cls, error: IntegrityError) -> Exception:
+        constraint = get_violated_constraint(error)
+        if constraint == "bookings_room_id_dates_excl":
+            return EntityAlreadyExists("booking")
+        if constraint == "bookings_date_range_check":
+            return InvalidBookingDates()
+        if constraint == "bookings_room_id_fkey":
+            return EntityNotFound("room")
+        if constraint == "bookings_user_id_fkey":
+            return EntityNotFound("user")
+        return error
@@ -0,0 +1,18 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class BulkMode(str, Enum):
+    insert = "insert"
+    copy = "copy"
+
+
+class BulkImportError(BaseModel):
+    index: int
+    detail: str
+
+
+class BulkImportResult(BaseModel):
+    inserted: int
+    errors: list[BulkImportError]
@@ -27,11 +27,98 @@ class Settings(BaseSettings):
     def TEST_DATABASE_URL(self):
         return f"postgresql+asyncpg://{self.TEST_POSTGRES_USER}:{self.TEST_POSTGRES_PASSWORD}@{self.TEST_POSTGRES_HOST}:{self.TEST_POSTGRES_PORT}/{self.TEST_POSTGRES_DB}"
 
+    REPLICA_POSTGRES_HOST: str | None = None
+    REPLICA_POSTGRES_PORT: str | None = None
+    REPLICA_POSTGRES_DB: str | None = None
+    REPLICA_POSTGRES_USER: str | None = None
+    REPLICA_POSTGRES_PASSWORD: str | None = None
+    REPLICA_STICKY_SECONDS: float = 5
+
+    @property
+    def REPLICA_DATABASE_URL(self):
+        if self.REPLICA_POSTGRES_HOST is None:
+            return None
+
+        if self.MODE == "TEST":
+            user, password = self.TEST_POSTGRES_USER, self.TEST_POSTGRES_PASSWORD
+            port, db = self.TEST_POSTGRES_PORT, self.TEST_POSTGRES_DB
+        else:
+            user, password = self.POSTGRES_USER, self.POSTGRES_PASSWORD
+            port, db = self.POSTGRES_PORT, self.POSTGRES_DB
+
+        return f"postgresql+asyncpg://{self.REPLICA_POSTGRES_USER or user}:{self.REPLICA_POSTGRES_PASSWORD or password}@{self.REPLICA_POSTGRES_HOST}:{self.REPLICA_POSTGRES_PORT or port}/{self.REPLICA_POSTGRES_DB or db}"
+
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
+
+    SLOW_QUERY_THRESHOLD_MS: float = 500
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = 0
+    SLOW_QUERY_LOG_SIZE: int = 100
+
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: int = 32
+    ADMISSION_MAX_QUEUE: int = 128
+    ADMISSION_MAX_QUEUE_WAIT_MS: float = 1000
+    ADMISSION_CRITICAL_RESERVED: int = 4
+    ADMISSION_BULK_MAX_CONCURRENCY: int | None = 4
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    ADMISSION_CRITICAL_ROUTES: list[str] = ["POST /bookings", "POST /auth/refresh"]
+    ADMISSION_BULK_PATH_PREFIXES: list[str] = [
+        "/admin",
+        "/rooms/bulk",
+        "/rooms/export",
+        "/bookings/bulk",
+        "/bookings/export",
+    ]
+    ADMISSION_EXEMPT_PATHS: list[str] = ["/metrics"]
+
+    RATE_LIMIT_ENABLED: bool = True
+    # "METHOD /route/template" -> "<requests>/<second|minute|hour|day>". Limits
+    # are kept in memory per worker, so the effective limit is multiplied by
+    # the number of uvicorn workers.
+    RATE_LIMITS: dict[str, str] = {
+        "POST /bookings": "30/minute",
+        "POST /auth/login": "10/minute",
+        "POST /auth/register": "5/minute",
+        "POST /auth/refresh": "30/minute",
+    }
+    RATE_LIMIT_STORE_MAXSIZE: int = 100000
+
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     USER_SESSION_EXPIRE_DAYS: int = 30
+    TOKEN_CACHE_MAXSIZE: int = 10000
+    MAX_SESSIONS_PER_USER: int = 10
+    REFRESH_SESSION_PRUNE_INTERVAL_SECONDS: int = 300
+    REFRESH_SESSION_PRUNE_BATCH_SIZE: int = 1000
+
+    PASSWORD_HASHER_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASHER_WORKERS: int = 4
+    PASSWORD_HASHER_MAX_PENDING: int = 64
+
+    AVAILABILITY_INDEX_ENABLED: bool = False
+    AVAILABILITY_INDEX_REFRESH_SECONDS: int = 60
+
+    AVAILABILITY_MAX_DAYS: int = 366
+    AVAILABILITY_CACHE_MAX_AGE: int = 30
+
+    OCCUPANCY_MAX_DAYS: int = 1830
+    OCCUPANCY_BACKFILL_BATCH_ROOMS: int = 100
+
+    EXPORT_BATCH_SIZE: int = 2000
+    BULK_IMPORT_BATCH_SIZE: int = 10000
+
+    ROOM_CACHE_MAXSIZE: int = 1000
+    ROOM_CACHE_TTL_SECONDS: int = 60
+
+    USER_CACHE_MAXSIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 30
 
     CORS_ORIGINS: list[str]
     CORS_HEADERS: list[str]
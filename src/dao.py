@@ -1,12 +1,35 @@
-from typing import Any, Dict, Generic, TypeVar, Union
+import logging
 
-from sqlalchemy import delete, insert, select, update
+from typing import Any, AsyncIterator, Dict, Generic, Sequence, TypeVar, Union
+
+from sqlalchemy import (
+    BigInteger,
+    Row,
+    Select,
+    case,
+    cast,
+    column,
+    delete,
+    insert,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+)
 from sqlalchemy.sql import func
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.selectable import ScalarSelect
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.dialects.postgresql import REGCLASS
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute, aliased
 from pydantic import BaseModel
 
 from .database import Base
+from .monitoring.queries import label_dao_methods
+from .pagination import CountMode, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
 
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -14,9 +37,17 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
+def get_violated_constraint(error: IntegrityError) -> str | None:
+    return getattr(error.orig.__cause__, "constraint_name", None)
+
+
 class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     model = None
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        label_dao_methods(cls)
+
     @classmethod
     async def find_one_or_none(
         cls,
@@ -36,6 +67,9 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         offset: int = 0,
         limit: int = 100,
         order_by=None,
+        keyset: Sequence[InstrumentedAttribute] | None = None,
+        after: Sequence[Any] | None = None,
+        descending: bool = False,
         **filter_by,
     ) -> list[ModelType]:
         statement = select(cls.model).filter(*filter).filter_by(**filter_by)
@@ -43,11 +77,156 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         if order_by is not None:
             statement = statement.order_by(order_by)
 
-        statement = statement.offset(offset).limit(limit)
+        statement = cls._paginate(statement, keyset, after, descending, offset, limit)
 
         result = await session.execute(statement)
         return result.scalars().all()
 
+    @classmethod
+    async def find_all_with_count(
+        cls,
+        session: AsyncSession,
+        *filter,
+        offset: int = 0,
+        limit: int = 100,
+        keyset: Sequence[InstrumentedAttribute] | None = None,
+        after: Sequence[Any] | None = None,
+        descending: bool = False,
+        count_mode: CountMode = CountMode.exact,
+        **filter_by,
+    ) -> tuple[list[ModelType], int | None]:
+        if count_mode == CountMode.none:
+            rows = await cls.find_all(
+                session,
+                *filter,
+                offset=offset,
+                limit=limit,
+                keyset=keyset,
+                after=after,
+                descending=descending,
+                **filter_by,
+            )
+            return rows, None
+
+        if count_mode == CountMode.estimated and not filter and not filter_by:
+            statement = select(cls.model, cls._estimated_count().label("total"))
+        else:
+            # The window count is computed before the keyset predicate so that
+            # it always reports the size of the whole filtered set.
+            subquery = (
+                select(cls.model, func.count().over().label("total"))
+                .filter(*filter)
+                .filter_by(**filter_by)
+                .subquery()
+            )
+            entity = aliased(cls.model, subquery)
+            statement = select(entity, subquery.c.total)
+            if keyset:
+                keyset = [getattr(entity, column.key) for column in keyset]
+
+        statement = cls._paginate(statement, keyset, after, descending, offset, limit)
+
+        result = await session.execute(statement)
+        rows = result.all()
+        if not rows:
+            return [], 0
+        return [row[0] for row in rows], rows[0].total
+
+    @classmethod
+    async def find_page(
+        cls,
+        session: AsyncSession,
+        *filter,
+        keyset: Sequence[InstrumentedAttribute],
+        cursor: str | None = None,
+        offset: int = 0,
+        limit: int = 100,
+        descending: bool = False,
+        count_mode: CountMode = CountMode.exact,
+        **filter_by,
+    ) -> tuple[list[ModelType], str | None, int | None]:
+        after = None
+        if cursor:
+            after = decode_cursor(cursor, keyset, descending)
+
+        rows, count = await cls.find_all_with_count(
+            session,
+            *filter,
+            offset=offset,
+            limit=limit + 1,
+            keyset=keyset,
+            after=after,
+            descending=descending,
+            count_mode=count_mode,
+            **filter_by,
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(
+                keyset,
+                [getattr(rows[-1], column.key) for column in keyset],
+                descending,
+            )
+        return rows, next_cursor, count
+
+    @classmethod
+    async def stream(
+        cls,
+        session: AsyncSession,
+        *filter,
+        columns: Sequence[InstrumentedAttribute] | None = None,
+        batch_size: int = 1000,
+        **filter_by,
+    ) -> AsyncIterator[Sequence[Row]]:
+        statement = (
+            select(*(columns or cls.model.__table__.columns))
+            .filter(*filter)
+            .filter_by(**filter_by)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await session.stream(statement)
+        async for partition in result.partitions():
+            yield partition
+
+    @classmethod
+    def _paginate(
+        cls,
+        statement: Select,
+        keyset: Sequence[InstrumentedAttribute] | None,
+        after: Sequence[Any] | None,
+        descending: bool,
+        offset: int,
+        limit: int,
+    ) -> Select:
+        if keyset:
+            if descending:
+                statement = statement.order_by(*(column.desc() for column in keyset))
+            else:
+                statement = statement.order_by(*(column.asc() for column in keyset))
+
+            if after is not None:
+                if descending:
+                    statement = statement.filter(tuple_(*keyset) < tuple(after))
+                else:
+                    statement = statement.filter(tuple_(*keyset) > tuple(after))
+                offset = 0
+
+        return statement.offset(offset).limit(limit)
+
+    @classmethod
+    def _estimated_count(cls) -> ScalarSelect:
+        # Planner statistics; reltuples is -1 until the table has been analyzed.
+        reltuples = (
+            select(column("reltuples"))
+            .select_from(table("pg_class"))
+            .where(column("oid") == cast(cls.model.__tablename__, REGCLASS))
+            .scalar_subquery()
+        )
+        exact = select(func.count()).select_from(cls.model).scalar_subquery()
+        return case((reltuples < 0, exact), else_=cast(reltuples, BigInteger))
+
     @classmethod
     async def add(
         cls,
@@ -69,7 +248,7 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             elif isinstance(e, Exception):
                 message = "Unknown Exc: Cannot insert data into table"
 
-            print(message)
+            logger.exception("%s: %s", cls.__name__, message)
             return None
 
     @classmethod
@@ -87,7 +266,7 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             elif isinstance(e, Exception):
                 message = "Unknown Exc: Cannot insert data into table"
 
-            print(message)
+            logger.exception("%s: %s", cls.__name__, message)
             return None
 
     @classmethod
@@ -122,19 +301,53 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     async def add_bulk(
         cls,
         session: AsyncSession,
-        data: list[Dict[str, Any]],
-    ):
-        try:
-            result = await session.execute(insert(cls.model).returning(cls.model), data)
-            return result.scalars().all()
-        except (SQLAlchemyError, Exception) as e:
-            if isinstance(e, SQLAlchemyError):
-                message = "Database Exc"
-            elif isinstance(e, Exception):
-                message = "Unknown Exc"
-            message += ": Cannot bulk insert data into table"
+        data: list[Union[CreateSchemaType, Dict[str, Any]]],
+    ) -> list[ModelType]:
+        if not data:
+            return []
 
-            return None
+        create_data = [
+            item if isinstance(item, dict) else item.model_dump(exclude_unset=True)
+            for item in data
+        ]
+        result = await session.execute(
+            insert(cls.model).returning(cls.model), create_data
+        )
+        return result.scalars().all()
+
+    @classmethod
+    async def copy_to_staging(
+        cls,
+        session: AsyncSession,
+        columns: list[str],
+        records: list[tuple],
+        batch_size: int = 10000,
+    ) -> str:
+        # The staging table has the target's columns plus the position of each
+        # record in the request, and is dropped when the transaction ends.
+        staging_table = f"{cls.model.__tablename__}_staging"
+        await session.execute(
+            text(
+                f"CREATE TEMP TABLE {staging_table} "
+                f"(LIKE {cls.model.__tablename__} INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+        )
+        await session.execute(
+            text(f"ALTER TABLE {staging_table} ADD COLUMN ordinal integer NOT NULL")
+        )
+
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        for start in range(0, len(records), batch_size):
+            await driver_connection.copy_records_to_table(
+                staging_table,
+                records=records[start : start + batch_size],
+                columns=[*columns, "ordinal"],
+            )
+
+        await session.execute(text(f"ANALYZE {staging_table}"))
+        return staging_table
 
     @classmethod
     async def update_bulk(
@@ -150,7 +363,7 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             elif isinstance(e, Exception):
                 message = "Unknown Exc"
             message += ": Cannot bulk update data into table"
-            print(message)
+            logger.exception("%s: %s", cls.__name__, message)
 
             return None
 
@@ -169,3 +382,6 @@ class BaseDAO(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         )
         result = await session.execute(statement)
         return result.scalar()
+
+
+label_dao_methods(BaseDAO)
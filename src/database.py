@@ -1,13 +1,18 @@
+from contextlib import asynccontextmanager
 from datetime import datetime
+from time import monotonic
+from typing import AsyncIterator, Callable, Hashable
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from sqlalchemy import DateTime, MetaData, NullPool, func
+from sqlalchemy import AsyncAdaptedQueuePool, DateTime, MetaData, NullPool, func
 
 from pydantic import BaseModel
 
 from .config import settings
 from .constants import DB_NAMING_CONVENTION
+from .monitoring.pool import InstrumentedAsyncQueuePool, instrument_pool
+from .monitoring.queries import instrument_engine
 
 
 class Base(DeclarativeBase):
@@ -33,8 +38,124 @@ if settings.MODE == "TEST":
     DATABASE_PARAMS = {"poolclass": NullPool}
 else:
     DATABASE_URL = settings.DATABASE_URL
-    DATABASE_PARAMS = {}
+    DATABASE_PARAMS = {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": {
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        },
+    }
 
 engine = create_async_engine(DATABASE_URL, **DATABASE_PARAMS)
+instrument_pool(engine.pool)
+instrument_engine(engine)
 
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    async with async_session_maker() as session:
+        yield session
+
+
+@asynccontextmanager
+async def session_scope(
+    session: AsyncSession | None = None,
+    session_maker: Callable[[], AsyncSession] = async_session_maker,
+) -> AsyncIterator[AsyncSession]:
+    # Services join the caller's session when given one and open their own
+    # otherwise, so scripts can keep calling them without a request.
+    if session is not None:
+        yield session
+        return
+
+    async with session_maker() as session:
+        yield session
+
+
+class ReadSessionMaker:
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replica: async_sessionmaker[AsyncSession] | None,
+        sticky_seconds: float,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.sticky_seconds = sticky_seconds
+        self._sticky: dict[Hashable, float] = {}
+
+    def __call__(self, *keys: Hashable) -> AsyncSession:
+        if self._use_replica(keys):
+            return self.replica()
+        return self.primary()
+
+    @asynccontextmanager
+    async def scope(
+        self, session: AsyncSession | None, *keys: Hashable
+    ) -> AsyncIterator[AsyncSession]:
+        # Replica reads stay on the replica inside a request too; reads that
+        # must hit the primary join the caller's session instead of taking a
+        # second connection.
+        if self._use_replica(keys):
+            async with self.replica() as session:
+                yield session
+            return
+
+        async with session_scope(session, self.primary) as session:
+            yield session
+
+    def _use_replica(self, keys: tuple[Hashable, ...]) -> bool:
+        if self.replica is None:
+            return False
+
+        now = monotonic()
+        for key in keys:
+            deadline = self._sticky.get(key)
+            if deadline is None:
+                continue
+            if deadline > now:
+                return False
+            del self._sticky[key]
+        return True
+
+    def stick(self, *keys: Hashable) -> None:
+        # Reads keyed by any of these keys go to the primary until replicas
+        # have had time to replay the write.
+        if self.replica is None:
+            return
+
+        now = monotonic()
+        if len(self._sticky) > 10000:
+            self._sticky = {
+                key: deadline
+                for key, deadline in self._sticky.items()
+                if deadline > now
+            }
+        for key in keys:
+            self._sticky[key] = now + self.sticky_seconds
+
+
+replica_engine = None
+replica_session_maker = None
+
+if settings.REPLICA_DATABASE_URL is not None:
+    REPLICA_PARAMS = dict(DATABASE_PARAMS)
+    if REPLICA_PARAMS["poolclass"] is not NullPool:
+        REPLICA_PARAMS["poolclass"] = AsyncAdaptedQueuePool
+
+    replica_engine = create_async_engine(
+        settings.REPLICA_DATABASE_URL, **REPLICA_PARAMS
+    )
+    replica_session_maker = async_sessionmaker(replica_engine, expire_on_commit=False)
+    instrument_engine(replica_engine)
+
+async_read_session_maker = ReadSessionMaker(
+    async_session_maker,
+    replica_session_maker,
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+)
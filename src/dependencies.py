@@ -0,0 +1,10 @@
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .database import get_session
+
+# Function scope closes the session before the response is sent, so streamed
+# responses do not keep a pooled connection checked out.
+RequestSession = Annotated[AsyncSession, Depends(get_session, scope="function")]
@@ -22,3 +22,35 @@ class NotEnoughPrivileges(HTTPException):
         super().__init__(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough privileges"
         )
+
+
+class InvalidCursor(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor"
+        )
+
+
+class InvalidDateRange(HTTPException):
+    def __init__(self, max_days: int):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Date range must be between 1 and {} days".format(max_days),
+        )
+
+
+class InvalidBookingDates(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must be earlier than date_to",
+        )
+
+
+class RateLimitExceeded(HTTPException):
+    def __init__(self, headers: dict[str, str]):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded, try again later",
+            headers=headers,
+        )
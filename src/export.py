@@ -0,0 +1,59 @@
+import csv
+import io
+import json
+
+from datetime import date
+from decimal import Decimal
+from enum import Enum
+from typing import Any, AsyncIterator, Sequence
+from uuid import UUID
+
+from sqlalchemy import Row
+
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def encode_rows(
+    partitions: AsyncIterator[Sequence[Row]],
+    columns: Sequence[str],
+    export_format: ExportFormat,
+) -> AsyncIterator[bytes]:
+    if export_format == ExportFormat.csv:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+
+        async for rows in partitions:
+            writer.writerows(rows)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        return
+
+    async for rows in partitions:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default) + "\n"
+            for row in rows
+        ).encode()
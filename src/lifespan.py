@@ -1,18 +1,35 @@
+import asyncio
 import logging
 
 from contextlib import asynccontextmanager
+from typing import Awaitable, Callable
 
 from fastapi import FastAPI
 
 from sqlalchemy.exc import ProgrammingError
 from asyncpg.exceptions import UndefinedTableError
 
+from .config import settings
 from .initial_data import init_data
+from .auth.hashing import password_hasher
+from .auth.service import AuthService
+from .bookings.service import BookingService
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+async def run_periodically(
+    interval: float, job: Callable[[], Awaitable[None]], name: str
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await job()
+        except Exception:
+            logger.exception("Periodic job %s failed", name)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Running initial data setup...")
@@ -24,4 +41,39 @@ async def lifespan(app: FastAPI):
             "Database tables do not exist yet. " "Skipping initial data initialization."
         )
 
+    tasks: list[asyncio.Task] = [
+        asyncio.create_task(
+            run_periodically(
+                settings.REFRESH_SESSION_PRUNE_INTERVAL_SECONDS,
+                AuthService.prune_expired_sessions,
+                "refresh session pruning",
+            )
+        )
+    ]
+
+    if settings.AVAILABILITY_INDEX_ENABLED:
+        logger.info("Loading room availability index...")
+        try:
+            await BookingService.load_availability()
+        except (ProgrammingError, UndefinedTableError):
+            logger.warning(
+                "Database tables do not exist yet. Availability index is empty."
+            )
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    settings.AVAILABILITY_INDEX_REFRESH_SECONDS,
+                    BookingService.load_availability,
+                    "availability index refresh",
+                )
+            )
+        )
+
     yield
+
+    for task in tasks:
+        task.cancel()
+    # Let a prune or refresh that was mid-run unwind before the hasher goes away.
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    password_hasher.shutdown()
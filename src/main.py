@@ -1,23 +1,29 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.responses import HTMLResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from sqladmin import Admin
 
+from .admission import AdmissionMiddleware
 from .admin import AdminAuth, AdminCookieMiddleware, UserAdmin, RoomAdmin, BookingAdmin
 
 from .config import settings
 from .database import engine
 from .lifespan import lifespan
+from .rate_limit import rate_limit
 
 from .auth.router import auth_router
 from .users.router import user_router
 from .rooms.router import room_router
 from .bookings.router import booking_router
+from .monitoring.middleware import MetricsMiddleware
+from .monitoring.router import monitoring_router
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, dependencies=[Depends(rate_limit)])
 
+# Innermost user middleware: shed responses still get CORS headers and metrics.
+app.add_middleware(AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.CORS_ORIGINS,
@@ -26,12 +32,14 @@ app.add_middleware(
     allow_headers=settings.CORS_HEADERS,
 )
 app.add_middleware(AdminCookieMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 routers = [
     auth_router,
     user_router,
     room_router,
     booking_router,
+    monitoring_router,
 ]
 
 for router in routers:
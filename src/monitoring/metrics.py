@@ -0,0 +1,184 @@
+import math
+
+from bisect import bisect_left
+from typing import Callable, Iterator, Sequence
+
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, int) or value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: "Registry | None" = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        if registry is None:
+            registry = default_registry
+        registry.register(self)
+
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        for name, labels, value in self.samples():
+            labelnames = self.labelnames
+            if len(labels) > len(labelnames):
+                labelnames = (*labelnames, "le")
+            lines.append(
+                f"{name}{_format_labels(labelnames, labels)} {_format_value(value)}"
+            )
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(
+        self,
+        *args,
+        function: Callable[[], float] | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function = function
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        if self._function is not None:
+            yield f"{self.name}_total", (), self._function()
+            return
+        if not self._values and not self.labelnames:
+            yield f"{self.name}_total", (), 0
+        for labels, value in self._values.items():
+            yield f"{self.name}_total", labels, value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(
+        self,
+        *args,
+        function: Callable[[], float] | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function = function
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        if self._function is not None:
+            yield self.name, (), self._function()
+            return
+        for labels, value in self._values.items():
+            yield self.name, labels, value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: one count per bucket (non-cumulative), then sum and count.
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self._values.get(labels)
+        if counts is None:
+            counts = self._values[labels] = [0] * (len(self.buckets) + 3)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        counts = self._values.get(labels)
+        return int(counts[-1]) if counts else 0
+
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        for labels, counts in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", (*labels, _format_value(bound)), cumulative
+            yield f"{self.name}_sum", labels, counts[-2]
+            yield f"{self.name}_count", labels, counts[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+default_registry = Registry()
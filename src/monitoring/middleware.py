@@ -0,0 +1,59 @@
+from time import perf_counter
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import Gauge, Histogram
+
+
+request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status.",
+    labelnames=("method", "route", "status"),
+)
+requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served.",
+)
+
+
+def _route_template(scope: Scope, root_path: str) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mounted apps such as the admin panel only extend root_path.
+    mount_path = scope.get("root_path", "")
+    if mount_path != root_path:
+        return mount_path[len(root_path) :] + "/*"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        root_path = scope.get("root_path", "")
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        requests_in_progress.inc()
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_progress.dec()
+            request_duration_seconds.observe(
+                perf_counter() - started,
+                scope["method"],
+                _route_template(scope, root_path),
+                str(status),
+            )
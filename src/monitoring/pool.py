@@ -0,0 +1,61 @@
+from time import perf_counter
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, PoolProxiedConnection
+
+from .metrics import Counter, Gauge, Histogram
+
+
+pool_wait_seconds = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent acquiring a connection from the pool.",
+)
+pool_timeouts = Counter(
+    "db_pool_timeouts",
+    "Connection acquisitions that gave up after pool_timeout.",
+)
+pool_overflow_opened = Counter(
+    "db_pool_overflow_connections_opened",
+    "Connections opened beyond pool_size.",
+)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    def connect(self) -> PoolProxiedConnection:
+        started = perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait_seconds.observe(perf_counter() - started)
+
+
+def instrument_pool(pool: Pool) -> None:
+    if not isinstance(pool, InstrumentedAsyncQueuePool):
+        return
+
+    Gauge("db_pool_size", "Configured pool_size.", function=pool.size)
+    Gauge(
+        "db_pool_checked_out_connections",
+        "Connections currently checked out of the pool.",
+        function=pool.checkedout,
+    )
+    Gauge(
+        "db_pool_idle_connections",
+        "Connections idle in the pool.",
+        function=pool.checkedin,
+    )
+    Gauge(
+        "db_pool_overflow_connections",
+        "Open connections beyond pool_size.",
+        function=lambda: max(pool.overflow(), 0),
+    )
+
+    @event.listens_for(pool, "connect")
+    def count_overflow(dbapi_connection, connection_record) -> None:
+        # QueuePool bumps its overflow counter before opening a connection, so
+        # a positive value here means this connection exceeds pool_size.
+        if pool.overflow() > 0:
+            pool_overflow_opened.inc()
@@ -0,0 +1,99 @@
+import inspect
+import sys
+
+from contextvars import ContextVar
+from functools import wraps
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .metrics import Histogram
+from .slow_queries import slow_query_log
+
+
+# (DAO class, method, calling function) of the outermost DAO call running in
+# this context.
+query_label: ContextVar[tuple[str, str, str] | None] = ContextVar(
+    "query_label", default=None
+)
+
+UNLABELED = ("none", "none", "none")
+
+query_duration_seconds = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time by DAO class and method.",
+    labelnames=("dao", "method"),
+)
+
+
+def _label_coroutine(name: str, function):
+    @wraps(function)
+    async def wrapper(cls, *args, **kwargs):
+        if query_label.get() is not None:
+            return await function(cls, *args, **kwargs)
+
+        caller = sys._getframe(1).f_code.co_qualname
+        token = query_label.set((cls.__name__, name, caller))
+        try:
+            return await function(cls, *args, **kwargs)
+        finally:
+            query_label.reset(token)
+
+    return wrapper
+
+
+def _label_async_generator(name: str, function):
+    # The label is only set while the generator body runs, so it never leaks
+    # into the consumer between items.
+    @wraps(function)
+    async def wrapper(cls, *args, **kwargs):
+        label = query_label.get() or (
+            cls.__name__,
+            name,
+            sys._getframe(1).f_code.co_qualname,
+        )
+        generator = function(cls, *args, **kwargs)
+        try:
+            while True:
+                token = query_label.set(label)
+                try:
+                    item = await generator.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    query_label.reset(token)
+                yield item
+        finally:
+            await generator.aclose()
+
+    return wrapper
+
+
+def label_dao_methods(cls: type) -> None:
+    for name, value in list(vars(cls).items()):
+        if name.startswith("_") or not isinstance(value, classmethod):
+            continue
+
+        function = value.__func__
+        if inspect.isasyncgenfunction(function):
+            setattr(cls, name, classmethod(_label_async_generator(name, function)))
+        elif inspect.iscoroutinefunction(function):
+            setattr(cls, name, classmethod(_label_coroutine(name, function)))
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def start_timer(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def observe(conn, cursor, statement, parameters, context, executemany):
+        duration = perf_counter() - context._query_started
+        label = query_label.get() or UNLABELED
+        query_duration_seconds.observe(duration, label[0], label[1])
+
+        if duration >= slow_query_log.threshold:
+            slow_query_log.record(
+                engine, statement, parameters, executemany, duration, label
+            )
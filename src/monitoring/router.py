@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..auth.dependencies import get_current_superuser
+from ..database import Message
+from .metrics import default_registry
+from .schemas import SlowQuery
+from .slow_queries import slow_query_log
+
+monitoring_router = APIRouter(tags=["monitoring"])
+
+
+@monitoring_router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+)
+async def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        default_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@monitoring_router.get(
+    "/monitoring/slow-queries",
+    dependencies=[Depends(get_current_superuser)],
+    response_model=list[SlowQuery],
+)
+async def get_slow_queries() -> list[SlowQuery]:
+    return slow_query_log.entries()
+
+
+@monitoring_router.delete(
+    "/monitoring/slow-queries",
+    dependencies=[Depends(get_current_superuser)],
+    response_model=Message,
+)
+async def clear_slow_queries() -> Message:
+    slow_query_log.clear()
+    return Message(message="Slow query log cleared")
@@ -0,0 +1,15 @@
+from datetime import datetime
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class SlowQuery(BaseModel):
+    recorded_at: datetime
+    duration_ms: float
+    dao: str
+    method: str
+    caller: str
+    statement: str
+    parameters: list[str]
+    plan: Any | None = None
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+import random
+
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ..config import settings
+from .schemas import SlowQuery
+
+logger = logging.getLogger(__name__)
+
+
+def parameter_shapes(parameters: Any, executemany: bool) -> list[str]:
+    if executemany:
+        rows = list(parameters)
+        shape = parameter_shapes(rows[0], False) if rows else []
+        return [f"{len(rows)} rows of ({', '.join(shape)})"]
+
+    if isinstance(parameters, dict):
+        parameters = parameters.values()
+
+    shapes = []
+    for value in parameters or ():
+        if isinstance(value, (list, tuple)):
+            shapes.append(f"{type(value).__name__}[{len(value)}]")
+        else:
+            shapes.append(type(value).__name__)
+    return shapes
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        threshold_ms: float = 500,
+        explain_sample_rate: float = 0,
+        maxsize: int = 100,
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain_sample_rate = explain_sample_rate
+
+        self._entries: deque[SlowQuery] = deque(maxlen=maxsize)
+        self._explaining: asyncio.Task | None = None
+
+    def record(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        executemany: bool,
+        duration: float,
+        label: Sequence[str],
+    ) -> None:
+        dao, method, caller = label
+        entry = SlowQuery(
+            recorded_at=datetime.now(timezone.utc),
+            duration_ms=round(duration * 1000, 3),
+            dao=dao,
+            method=method,
+            caller=caller,
+            statement=statement,
+            parameters=parameter_shapes(parameters, executemany),
+        )
+        self._entries.append(entry)
+        logger.warning(
+            "Slow query (%.1f ms) in %s.%s called from %s: %s %s",
+            entry.duration_ms,
+            dao,
+            method,
+            caller,
+            statement,
+            entry.parameters,
+        )
+
+        if self._should_explain(statement, executemany):
+            self._explaining = asyncio.get_running_loop().create_task(
+                self._explain(engine, entry, parameters)
+            )
+
+    def entries(self) -> list[SlowQuery]:
+        return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _should_explain(self, statement: str, executemany: bool) -> bool:
+        # EXPLAIN ANALYZE executes the statement, so only plain SELECTs qualify
+        # (a WITH may wrap a data-modifying CTE).
+        # At most one plan is captured at a time so a burst of slow queries
+        # cannot double the load that caused it.
+        return (
+            not executemany
+            and statement.lstrip()[:6].upper() == "SELECT"
+            and (self._explaining is None or self._explaining.done())
+            and random.random() < self.explain_sample_rate
+        )
+
+    async def _explain(
+        self, engine: AsyncEngine, entry: SlowQuery, parameters: Any
+    ) -> None:
+        try:
+            async with engine.connect() as connection:
+                raw_connection = await connection.get_raw_connection()
+                driver_connection = raw_connection.driver_connection
+                plan = await driver_connection.fetchval(
+                    f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {entry.statement}",
+                    *(parameters or ()),
+                )
+                await connection.rollback()
+            entry.plan = json.loads(plan) if isinstance(plan, str) else plan
+        except Exception:
+            logger.exception("Could not capture plan for slow query")
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    explain_sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    maxsize=settings.SLOW_QUERY_LOG_SIZE,
+)
@@ -0,0 +1,84 @@
+import base64
+import binascii
+import json
+
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Sequence
+from uuid import UUID
+
+from sqlalchemy.orm import InstrumentedAttribute
+
+from .exceptions import InvalidCursor
+
+
+class CountMode(str, Enum):
+    exact = "exact"
+    estimated = "estimated"
+    none = "none"
+
+
+_ENCODERS = (
+    (UUID, "uuid", str),
+    (Decimal, "decimal", str),
+    (datetime, "datetime", datetime.isoformat),
+    (date, "date", date.isoformat),
+    (bool, "bool", bool),
+    (int, "int", int),
+    (float, "float", float),
+    (str, "str", str),
+)
+
+_DECODERS = {
+    "uuid": UUID,
+    "decimal": Decimal,
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "bool": bool,
+    "int": int,
+    "float": float,
+    "str": str,
+}
+
+
+def _encode_value(value: Any) -> list:
+    for value_type, tag, encode in _ENCODERS:
+        if isinstance(value, value_type):
+            return [tag, encode(value)]
+    raise TypeError(f"Cannot use {type(value).__name__} as a cursor key")
+
+
+def encode_cursor(
+    keyset: Sequence[InstrumentedAttribute],
+    values: Sequence[Any],
+    descending: bool = False,
+) -> str:
+    payload = {
+        "k": [column.key for column in keyset],
+        "d": descending,
+        "v": [_encode_value(value) for value in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(
+    cursor: str,
+    keyset: Sequence[InstrumentedAttribute],
+    descending: bool = False,
+) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+
+        if payload["k"] != [column.key for column in keyset]:
+            raise InvalidCursor
+        if payload["d"] != descending:
+            raise InvalidCursor
+
+        return [_DECODERS[tag](value) for tag, value in payload["v"]]
+    except InvalidCursor:
+        raise
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor
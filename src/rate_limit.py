@@ -0,0 +1,184 @@
+import math
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from heapq import heapify, heappop, heappush
+from time import monotonic
+from typing import NamedTuple
+
+from fastapi import Request, Response
+from jose import JWTError
+
+from .auth.tokens import decode_access_token
+from .config import settings
+from .exceptions import RateLimitExceeded
+from .monitoring.metrics import Counter, Gauge
+
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimit(NamedTuple):
+    capacity: int
+    refill_rate: float
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        # "10/minute": a bucket of 10 tokens refilled evenly over a minute.
+        count, _, period = value.partition("/")
+        try:
+            return cls(int(count), int(count) / PERIODS[period.strip()])
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid rate limit {value!r}")
+
+
+class RateLimitDecision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(math.ceil(self.retry_after))
+        return headers
+
+
+class RateLimitStore(ABC):
+    # Shared stores must make consume atomic per key, e.g. with a server-side
+    # script, since several workers hit the same bucket concurrently.
+    @abstractmethod
+    async def consume(
+        self, key: str, limit: RateLimit, cost: int = 1
+    ) -> RateLimitDecision: ...
+
+    def __len__(self) -> int:
+        return 0
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    # Buckets live in one process, so with N workers a client can get up to N
+    # times the configured limit.
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        # key -> (tokens, updated_at, full_at), ordered by last update for the
+        # maxsize eviction. A bucket that has refilled is the same as a missing
+        # one, so it is dropped.
+        self._buckets: OrderedDict[str, tuple[float, float, float]] = OrderedDict()
+        # (full_at, key) per bucket update. Limits refill at different rates, so
+        # expiry follows this heap rather than update order; entries superseded
+        # by a later update are skipped when they come up.
+        self._expiry: list[tuple[float, str]] = []
+
+    async def consume(
+        self, key: str, limit: RateLimit, cost: int = 1
+    ) -> RateLimitDecision:
+        now = monotonic()
+        self._expire(now)
+
+        tokens = limit.capacity
+        bucket = self._buckets.pop(key, None)
+        if bucket is not None:
+            bucket_tokens, updated_at, _ = bucket
+            tokens = min(
+                limit.capacity, bucket_tokens + (now - updated_at) * limit.refill_rate
+            )
+
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+
+        reset_after = (limit.capacity - tokens) / limit.refill_rate
+        if reset_after > 0:
+            self._buckets[key] = (tokens, now, now + reset_after)
+            heappush(self._expiry, (now + reset_after, key))
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            if len(self._expiry) > 2 * len(self._buckets) + 1024:
+                self._expiry = [
+                    (full_at, key) for key, (_, _, full_at) in self._buckets.items()
+                ]
+                heapify(self._expiry)
+
+        return RateLimitDecision(
+            allowed=allowed,
+            limit=limit.capacity,
+            remaining=math.floor(tokens),
+            retry_after=0 if allowed else (cost - tokens) / limit.refill_rate,
+            reset_after=reset_after,
+        )
+
+    def _expire(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            full_at, key = heappop(self._expiry)
+            bucket = self._buckets.get(key)
+            if bucket is not None and bucket[2] == full_at:
+                del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RateLimiter:
+    def __init__(self, store: RateLimitStore, limits: dict[str, str]):
+        self.store = store
+        self.limits = {route: RateLimit.parse(value) for route, value in limits.items()}
+
+    async def hit(self, route: str, identity: str) -> RateLimitDecision | None:
+        limit = self.limits.get(route)
+        if limit is None:
+            return None
+        return await self.store.consume(f"{route}:{identity}", limit)
+
+
+rate_limiter = RateLimiter(
+    MemoryRateLimitStore(maxsize=settings.RATE_LIMIT_STORE_MAXSIZE),
+    settings.RATE_LIMITS,
+)
+
+requests_limited = Counter(
+    "http_requests_rate_limited",
+    "Requests rejected with 429 by the rate limiter.",
+    labelnames=("route",),
+)
+Gauge(
+    "rate_limit_buckets",
+    "Rate limit buckets currently held in memory.",
+    function=lambda: len(rate_limiter.store),
+)
+
+
+def _identity(request: Request) -> str:
+    token = request.cookies.get("access_token")
+    if token and token.lower().startswith("bearer "):
+        try:
+            user_id = decode_access_token(token.split(" ", 1)[1]).get("sub")
+        except JWTError:
+            user_id = None
+        if user_id:
+            return f"user:{user_id}"
+
+    client = request.client
+    return f"ip:{client.host if client else 'unknown'}"
+
+
+async def rate_limit(request: Request, response: Response) -> None:
+    route = request.scope.get("route")
+    if not settings.RATE_LIMIT_ENABLED or route is None:
+        return
+
+    route_key = f"{request.method} {route.path}"
+    decision = await rate_limiter.hit(route_key, _identity(request))
+    if decision is None:
+        return
+
+    if not decision.allowed:
+        requests_limited.inc(route_key)
+        raise RateLimitExceeded(decision.headers())
+    response.headers.update(decision.headers())
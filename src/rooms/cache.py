@@ -0,0 +1,99 @@
+from hashlib import blake2b
+from typing import Hashable, NamedTuple
+from uuid import UUID
+
+from fastapi import Response
+
+from ..cache import TTLCache
+from ..config import settings
+from ..monitoring.metrics import Counter, Gauge
+
+
+class CachedBody(NamedTuple):
+    etag: str
+    body: bytes
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class CatalogCache:
+    def __init__(self, maxsize: int = 1000, ttl: float = 60):
+        self._bodies: TTLCache[Hashable, CachedBody] = TTLCache(maxsize, ttl)
+        # Versions are part of every cache key, so a body serialized from a
+        # read that raced with a write is stored under a stale key and never
+        # served.
+        self.catalog_version = 0
+        self._room_versions: dict[UUID, int] = {}
+
+    def room_key(self, room_id: UUID) -> Hashable:
+        return ("room", room_id, self._room_versions.get(room_id, 0))
+
+    def list_key(self, params: Hashable) -> Hashable:
+        return ("rooms", self.catalog_version, params)
+
+    def get(self, key: Hashable) -> CachedBody | None:
+        return self._bodies.get(key)
+
+    def set(self, key: Hashable | None, body: bytes) -> CachedBody:
+        cached = CachedBody(make_etag(body), body)
+        if key is not None:
+            self._bodies.set(key, cached)
+        return cached
+
+    def bump(self, *room_ids: UUID) -> None:
+        self.catalog_version += 1
+        for room_id in room_ids:
+            self._room_versions[room_id] = self._room_versions.get(room_id, 0) + 1
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored.
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def cached_response(cached: CachedBody, if_none_match: str | None) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
+
+
+catalog_cache = CatalogCache(
+    maxsize=settings.ROOM_CACHE_MAXSIZE,
+    ttl=settings.ROOM_CACHE_TTL_SECONDS,
+)
+
+Counter(
+    "room_cache_hits",
+    "Room responses served from the catalog cache.",
+    function=lambda: catalog_cache._bodies.hits,
+)
+Counter(
+    "room_cache_misses",
+    "Room responses that had to be built from the database.",
+    function=lambda: catalog_cache._bodies.misses,
+)
+Counter(
+    "room_cache_evictions",
+    "Room responses evicted from the catalog cache to stay under maxsize.",
+    function=lambda: catalog_cache._bodies.evictions,
+)
+Gauge(
+    "room_cache_size",
+    "Room responses currently cached.",
+    function=lambda: len(catalog_cache._bodies),
+)
+Counter(
+    "room_catalog_invalidations",
+    "Room catalog writes that invalidated cached room lists.",
+    function=lambda: catalog_cache.catalog_version,
+)
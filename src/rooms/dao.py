@@ -1,8 +1,190 @@
+from datetime import date
+from uuid import UUID
+
+from sqlalchemy import (
+    Date,
+    Integer,
+    and_,
+    column,
+    exists,
+    func,
+    literal,
+    or_,
+    select,
+    text,
+    true,
+    values,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from .models import RoomModel
 from .schemas import RoomCreate, RoomUpdate
 
 from ..dao import BaseDAO
+from ..pagination import CountMode
+from ..bookings.models import BookingModel
 
 
 class RoomDAO(BaseDAO[RoomModel, RoomCreate, RoomUpdate]):
     model = RoomModel
+
+    @classmethod
+    def name_filter(cls, q: str):
+        # Both branches are served by the rooms_name_trgm_idx GIN index: a plain
+        # substring match, and pg_trgm word similarity for typos.
+        pattern = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return or_(
+            cls.model.name.ilike(f"%{pattern}%", escape="\\"),
+            literal(q).op("<%")(cls.model.name),
+        )
+
+    @classmethod
+    async def search(
+        cls,
+        session: AsyncSession,
+        q: str,
+        *filter,
+        offset: int = 0,
+        limit: int = 100,
+        count_mode: CountMode = CountMode.exact,
+    ) -> tuple[list[RoomModel], int | None]:
+        statement = select(cls.model)
+        if count_mode != CountMode.none:
+            statement = select(cls.model, func.count().over().label("total"))
+
+        statement = (
+            statement.filter(cls.name_filter(q), *filter)
+            .order_by(
+                func.word_similarity(q, cls.model.name).desc(),
+                cls.model.name,
+                cls.model.id,
+            )
+            .offset(offset)
+            .limit(limit)
+        )
+        result = await session.execute(statement)
+        rows = result.all()
+        if not rows:
+            return [], 0
+        total = rows[0].total if count_mode != CountMode.none else None
+        return [row[0] for row in rows], total
+
+    @classmethod
+    async def find_ids(cls, session: AsyncSession, room_ids: list[UUID]) -> list[UUID]:
+        statement = select(cls.model.id).filter(cls.model.id.in_(room_ids))
+        result = await session.execute(statement)
+        return result.scalars().all()
+
+    @classmethod
+    async def find_all_ids(cls, session: AsyncSession) -> list[UUID]:
+        result = await session.execute(select(cls.model.id).order_by(cls.model.id))
+        return result.scalars().all()
+
+    @classmethod
+    async def find_booked_intervals(
+        cls,
+        session: AsyncSession,
+        room_ids: list[UUID],
+        date_from: date,
+        date_to: date,
+    ) -> list[tuple]:
+        booked_dates = func.daterange(BookingModel.date_from, BookingModel.date_to)
+        statement = (
+            select(cls.model.id, BookingModel.date_from, BookingModel.date_to)
+            .outerjoin(
+                BookingModel,
+                and_(
+                    BookingModel.room_id == cls.model.id,
+                    booked_dates.op("&&")(func.daterange(date_from, date_to)),
+                ),
+            )
+            .filter(cls.model.id.in_(room_ids))
+        )
+        result = await session.execute(statement)
+        return result.all()
+
+    @classmethod
+    async def find_prices(
+        cls, session: AsyncSession, *filters, limit: int | None = None
+    ) -> list[tuple]:
+        statement = (
+            select(cls.model.id, cls.model.price_per_day)
+            .filter(*filters)
+            .order_by(cls.model.created_at, cls.model.id)
+            .limit(limit)
+        )
+        result = await session.execute(statement)
+        return result.all()
+
+    @classmethod
+    async def find_quotes(
+        cls,
+        session: AsyncSession,
+        ranges: list[tuple[date, date]],
+        *filters,
+        limit: int | None = None,
+    ) -> list[tuple]:
+        # Every matching room is paired with every stay in one statement; the
+        # overlap probe per pair is served by the bookings exclusion index.
+        stays = values(
+            column("position", Integer),
+            column("date_from", Date),
+            column("date_to", Date),
+            name="stays",
+        ).data([(position, *stay) for position, stay in enumerate(ranges)])
+        rooms = (
+            select(cls.model.id, cls.model.price_per_day, cls.model.created_at)
+            .filter(*filters)
+            .order_by(cls.model.created_at, cls.model.id)
+            .limit(limit)
+            .subquery("rooms")
+        )
+        booked = exists().where(
+            BookingModel.room_id == rooms.c.id,
+            func.daterange(BookingModel.date_from, BookingModel.date_to).op("&&")(
+                func.daterange(stays.c.date_from, stays.c.date_to)
+            ),
+        )
+        statement = (
+            select(
+                rooms.c.id,
+                rooms.c.price_per_day,
+                stays.c.position,
+                ~booked,
+            )
+            .select_from(rooms.join(stays, true()))
+            .order_by(rooms.c.created_at, rooms.c.id, stays.c.position)
+        )
+        result = await session.execute(statement)
+        return result.all()
+
+    @classmethod
+    async def merge_staging(
+        cls, session: AsyncSession, staging_table: str
+    ) -> list[tuple[int, str]]:
+        statement = text(
+            f"""
+            WITH checked AS (
+                SELECT
+                    staging.*,
+                    CASE
+                        WHEN EXISTS (
+                            SELECT 1 FROM rooms WHERE rooms.name = staging.name
+                        ) THEN 'Room already exists'
+                        WHEN row_number() OVER (
+                            PARTITION BY staging.name ORDER BY staging.ordinal
+                        ) > 1 THEN 'Duplicate room name in import'
+                    END AS error
+                FROM {staging_table} AS staging
+            ), inserted AS (
+                INSERT INTO rooms (id, name, price_per_day, places)
+                SELECT id, name, price_per_day, places FROM checked
+                WHERE error IS NULL
+            )
+            SELECT ordinal, error FROM checked
+            WHERE error IS NOT NULL
+            ORDER BY ordinal
+            """
+        )
+        result = await session.execute(statement)
+        return result.all()
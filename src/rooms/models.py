@@ -1,6 +1,6 @@
 from uuid import UUID, uuid4
 
-from sqlalchemy import String, Numeric, Integer
+from sqlalchemy import Index, String, Numeric, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID as pgUUID
 
@@ -9,6 +9,16 @@ from ..database import Base
 
 class RoomModel(Base):
     __tablename__ = "rooms"
+    __table_args__ = (
+        Index("rooms_price_per_day_id_idx", "price_per_day", "id"),
+        Index("rooms_created_at_id_idx", "created_at", "id"),
+        Index(
+            "rooms_name_trgm_idx",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(
         pgUUID, primary_key=True, index=True, default=uuid4
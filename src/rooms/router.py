@@ -3,13 +3,29 @@ from uuid import UUID
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query, Path, status
+from fastapi import APIRouter, Depends, Header, Query, Path, Response, status
+from fastapi.responses import StreamingResponse
 
+from src.bulk_import import BulkImportResult, BulkMode
 from src.database import Message
-
-from .schemas import Room, RoomCreate, RoomUpdate, Rooms
+from src.dependencies import RequestSession
+from src.export import EXPORT_MEDIA_TYPES, ExportFormat
+from src.pagination import CountMode
+
+from .cache import cached_response
+from .schemas import (
+    QuoteRequest,
+    Room,
+    RoomAvailability,
+    RoomCreate,
+    RoomQuote,
+    RoomUpdate,
+    Rooms,
+)
 from .service import RoomService, SortOptions
 from ..auth.dependencies import get_current_superuser
+from ..config import settings
+from ..exceptions import EntityNotFound
 
 room_router = APIRouter(prefix="/rooms", tags=["room"])
 
@@ -22,29 +38,85 @@ room_router = APIRouter(prefix="/rooms", tags=["room"])
 )
 async def add_room(
     room: RoomCreate,
+    session: RequestSession,
 ) -> Room:
-    return await RoomService.add_room(room)
+    return await RoomService.add_room(room, session)
 
 
 @room_router.post(
     "/bulk",
     status_code=status.HTTP_201_CREATED,
     dependencies=[Depends(get_current_superuser)],
-    response_model=list[Room],
+    response_model=list[Room] | BulkImportResult,
 )
 async def add_rooms(
     rooms: list[RoomCreate],
-) -> list[Room]:
-    return await RoomService.add_rooms(rooms)
+    session: RequestSession,
+    mode: BulkMode = BulkMode.insert,
+) -> list[Room] | BulkImportResult:
+    return await RoomService.add_rooms(rooms, mode, session)
+
+
+@room_router.get("/export", dependencies=[Depends(get_current_superuser)])
+async def export_rooms(
+    export_format: ExportFormat = Query(ExportFormat.ndjson, alias="format"),
+) -> StreamingResponse:
+    return StreamingResponse(
+        RoomService.export_rooms(export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename=rooms.{export_format.value}"
+        },
+    )
+
+
+@room_router.post("/quote", response_model=list[RoomQuote])
+async def get_quotes(quote: QuoteRequest) -> list[RoomQuote]:
+    return await RoomService.get_quotes(quote)
+
+
+@room_router.get("/availability", response_model=list[RoomAvailability])
+async def get_rooms_availability(
+    response: Response,
+    room_ids: Annotated[list[UUID], Query(min_length=1, max_length=100)],
+    date_from: date = Query(alias="from"),
+    date_to: date = Query(alias="to"),
+) -> list[RoomAvailability]:
+    response.headers["Cache-Control"] = (
+        f"public, max-age={settings.AVAILABILITY_CACHE_MAX_AGE}"
+    )
+    return await RoomService.get_availability(room_ids, date_from, date_to)
+
+
+@room_router.get("/{room_id}/availability", response_model=RoomAvailability)
+async def get_room_availability(
+    response: Response,
+    room_id: UUID = Path(...),
+    date_from: date = Query(alias="from"),
+    date_to: date = Query(alias="to"),
+) -> RoomAvailability:
+    availability = await RoomService.get_availability([room_id], date_from, date_to)
+    if not availability:
+        raise EntityNotFound("room")
+
+    response.headers["Cache-Control"] = (
+        f"public, max-age={settings.AVAILABILITY_CACHE_MAX_AGE}"
+    )
+    return availability[0]
 
 
 @room_router.get("/{room_id}", response_model=Room)
-async def get_room(room_id: UUID = Path(...)) -> Room:
-    return await RoomService.get_room(room_id)
+async def get_room(
+    room_id: UUID = Path(...),
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    cached = await RoomService.get_room_cached(room_id)
+    return cached_response(cached, if_none_match)
 
 
 @room_router.get("", response_model=Rooms)
 async def get_rooms(
+    cursor: str | None = None,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(ge=1, le=100)] = 100,
     min_price: float | None = None,
@@ -53,8 +125,12 @@ async def get_rooms(
     date_from: date | None = None,
     date_to: date | None = None,
     sort_by_price: SortOptions | None = None,
-) -> Rooms:
-    return await RoomService.get_rooms(
+    count: CountMode = CountMode.exact,
+    q: Annotated[str | None, Query(min_length=1, max_length=100)] = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> Response:
+    cached = await RoomService.get_rooms_cached(
+        cursor=cursor,
         offset=offset,
         limit=limit,
         min_price=min_price,
@@ -63,7 +139,10 @@ async def get_rooms(
         date_from=date_from,
         date_to=date_to,
         sort_by_price=sort_by_price,
+        count=count,
+        q=q,
     )
+    return cached_response(cached, if_none_match)
 
 
 @room_router.put(
@@ -71,16 +150,18 @@ async def get_rooms(
 )
 async def update_room(
     room: RoomUpdate,
+    session: RequestSession,
     room_id: UUID = Path(...),
 ) -> Room:
-    return await RoomService.update_room(room_id, room)
+    return await RoomService.update_room(room_id, room, session)
 
 
 @room_router.delete(
     "/{room_id}", dependencies=[Depends(get_current_superuser)], response_model=Message
 )
 async def delete_room(
+    session: RequestSession,
     room_id: UUID = Path(...),
 ) -> Message:
-    await RoomService.delete_room(room_id)
+    await RoomService.delete_room(room_id, session)
     return Message(message="Room deleted successfully")
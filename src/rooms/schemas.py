@@ -1,6 +1,7 @@
+from datetime import date
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class RoomUpdate(BaseModel):
@@ -24,4 +25,46 @@ class Room(RoomCreate):
 
 class Rooms(BaseModel):
     data: list[Room]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
+
+
+class RoomAvailability(BaseModel):
+    room_id: UUID
+    date_from: date
+    date_to: date
+    booked: str
+
+
+class StayRange(BaseModel):
+    date_from: date
+    date_to: date
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.date_from >= self.date_to:
+            raise ValueError("date_from must be earlier than date_to")
+        return self
+
+
+class QuoteRequest(BaseModel):
+    room_ids: list[UUID] | None = Field(default=None, min_length=1, max_length=1000)
+    min_price: float | None = Field(default=None)
+    max_price: float | None = Field(default=None)
+    places: int | None = Field(default=None)
+    limit: int = Field(default=100, ge=1, le=1000)
+    ranges: list[StayRange] = Field(min_length=1, max_length=10)
+
+
+class StayQuote(BaseModel):
+    date_from: date
+    date_to: date
+    nights: int
+    total_price: float
+    available: bool
+
+
+class RoomQuote(BaseModel):
+    room_id: UUID
+    price_per_day: float
+    quotes: list[StayQuote]
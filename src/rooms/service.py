@@ -1,14 +1,37 @@
 from enum import Enum
-from datetime import date
-from uuid import UUID
+from datetime import date, timedelta
+from typing import AsyncIterator
+from uuid import UUID, uuid4
 
-from sqlalchemy import and_, exists, not_
+from sqlalchemy import all_, and_, exists, func, literal, not_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as pgUUID
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..exceptions import EntityAlreadyExists, EntityNotFound
+from ..exceptions import (
+    EntityAlreadyExists,
+    EntityNotFound,
+    InvalidCursor,
+    InvalidDateRange,
+)
 
-from ..database import async_session_maker
+from ..bulk_import import BulkImportError, BulkImportResult, BulkMode
+from ..config import settings
+from ..database import async_read_session_maker, async_session_maker, session_scope
+from ..export import ExportFormat, encode_rows
+from ..pagination import CountMode
 from ..bookings.models import BookingModel
-from .schemas import Room, RoomCreate, RoomUpdate, Rooms
+from ..bookings.availability import availability_index
+from .cache import CachedBody, catalog_cache
+from .schemas import (
+    QuoteRequest,
+    Room,
+    RoomAvailability,
+    RoomCreate,
+    RoomQuote,
+    RoomUpdate,
+    Rooms,
+    StayQuote,
+)
 from .models import RoomModel
 from .dao import RoomDAO
 
@@ -20,34 +43,101 @@ class SortOptions(str, Enum):
 
 class RoomService:
     @classmethod
-    async def add_room(cls, room: RoomCreate) -> Room:
-        async with async_session_maker() as session:
+    async def add_room(
+        cls, room: RoomCreate, session: AsyncSession | None = None
+    ) -> Room:
+        async with session_scope(session) as session:
             room_exist = await RoomDAO.find_one_or_none(session, name=room.name)
             if room_exist:
                 raise EntityAlreadyExists("room")
 
             db_room = await RoomDAO.add(session, room)
             await session.commit()
+        async_read_session_maker.stick("rooms")
+        catalog_cache.bump()
         return db_room
 
     @classmethod
-    async def add_rooms(cls, rooms: list[RoomCreate]) -> list[Room]:
-        async with async_session_maker() as session:
+    async def add_rooms(
+        cls,
+        rooms: list[RoomCreate],
+        mode: BulkMode = BulkMode.insert,
+        session: AsyncSession | None = None,
+    ) -> list[Room] | BulkImportResult:
+        if mode == BulkMode.copy:
+            return await cls.import_rooms(rooms, session)
+
+        async with session_scope(session) as session:
             db_rooms = await RoomDAO.add_bulk(session, rooms)
             await session.commit()
+        async_read_session_maker.stick("rooms")
+        catalog_cache.bump()
         return db_rooms
 
+    @classmethod
+    async def import_rooms(
+        cls, rooms: list[RoomCreate], session: AsyncSession | None = None
+    ) -> BulkImportResult:
+        records = [
+            (uuid4(), room.name, room.price_per_day, room.places, ordinal)
+            for ordinal, room in enumerate(rooms)
+        ]
+        async with session_scope(session) as session:
+            staging_table = await RoomDAO.copy_to_staging(
+                session,
+                ["id", "name", "price_per_day", "places"],
+                records,
+                batch_size=settings.BULK_IMPORT_BATCH_SIZE,
+            )
+            errors = await RoomDAO.merge_staging(session, staging_table)
+            await session.commit()
+        async_read_session_maker.stick("rooms")
+        catalog_cache.bump()
+        return BulkImportResult(
+            inserted=len(records) - len(errors),
+            errors=[
+                BulkImportError(index=ordinal, detail=detail)
+                for ordinal, detail in errors
+            ],
+        )
+
     @classmethod
     async def get_room(cls, room_id: UUID) -> Room:
-        async with async_session_maker() as session:
+        async with async_read_session_maker("rooms") as session:
             db_room = await RoomDAO.find_one_or_none(session, id=room_id)
         if db_room is None:
             raise EntityNotFound("room")
         return db_room
 
+    @classmethod
+    async def get_room_cached(cls, room_id: UUID) -> CachedBody:
+        key = catalog_cache.room_key(room_id)
+        cached = catalog_cache.get(key)
+        if cached is not None:
+            return cached
+
+        db_room = await cls.get_room(room_id)
+        body = Room.model_validate(db_room).model_dump_json().encode()
+        return catalog_cache.set(key, body)
+
+    @classmethod
+    async def get_rooms_cached(cls, **params) -> CachedBody:
+        # Availability-filtered pages change with every booking, so only the
+        # plain catalog is kept; those pages still get an ETag.
+        key = None
+        if not (params.get("date_from") and params.get("date_to")):
+            key = catalog_cache.list_key(tuple(sorted(params.items())))
+            cached = catalog_cache.get(key)
+            if cached is not None:
+                return cached
+
+        rooms = await cls.get_rooms(**params)
+        return catalog_cache.set(key, rooms.model_dump_json().encode())
+
     @classmethod
     async def get_rooms(
         cls,
+        cursor: str | None = None,
         offset: int = 0,
         limit: int = 100,
         min_price: float | None = None,
@@ -56,6 +146,8 @@ class RoomService:
         date_from: date | None = None,
         date_to: date | None = None,
         sort_by_price: SortOptions | None = None,
+        count: CountMode = CountMode.exact,
+        q: str | None = None,
     ) -> Rooms:
         filters = []
 
@@ -68,38 +160,61 @@ class RoomService:
         if places is not None:
             filters.append(RoomModel.places == places)
 
-        if date_from and date_to:
+        if date_from and date_to and availability_index.covers(date_from):
+            booked_rooms = availability_index.booked_rooms(date_from, date_to)
+            if booked_rooms:
+                filters.append(
+                    RoomModel.id != all_(literal(booked_rooms, ARRAY(pgUUID)))
+                )
+        elif date_from and date_to:
+            booked_dates = func.daterange(BookingModel.date_from, BookingModel.date_to)
             booking_exists = exists().where(
                 and_(
                     BookingModel.room_id == RoomModel.id,
-                    BookingModel.date_from < date_to,
-                    BookingModel.date_to > date_from,
+                    booked_dates.op("&&")(func.daterange(date_from, date_to)),
                 )
             )
             filters.append(not_(booking_exists))
 
-        order_by = None
-        if sort_by_price == "asc":
-            order_by = RoomModel.price_per_day.asc()
-        elif sort_by_price == "desc":
-            order_by = RoomModel.price_per_day.desc()
+        if q and sort_by_price is None:
+            # Ranked results have no stable keyset, so they page by offset.
+            if cursor:
+                raise InvalidCursor
+            async with async_read_session_maker("rooms") as session:
+                rooms, total = await RoomDAO.search(
+                    session, q, *filters, offset=offset, limit=limit, count_mode=count
+                )
+            if not rooms:
+                raise EntityNotFound("room")
+            return Rooms(data=rooms, count=total)
+
+        if q:
+            filters.append(RoomDAO.name_filter(q))
 
-        async with async_session_maker() as session:
-            rooms = await RoomDAO.find_all(
+        keyset = [RoomModel.created_at, RoomModel.id]
+        if sort_by_price is not None:
+            keyset = [RoomModel.price_per_day, RoomModel.id]
+
+        async with async_read_session_maker("rooms") as session:
+            rooms, next_cursor, total = await RoomDAO.find_page(
                 session,
                 *filters,
-                order_by=order_by,
+                keyset=keyset,
+                cursor=cursor,
                 offset=offset,
                 limit=limit,
+                descending=sort_by_price == SortOptions.desc,
+                count_mode=count,
             )
-            if not rooms:
-                raise EntityNotFound("room")
-            count = await RoomDAO.count(session, *filters)
-        return Rooms(data=rooms, count=count)
+        if not rooms:
+            raise EntityNotFound("room")
+        return Rooms(data=rooms, count=total, next_cursor=next_cursor)
 
     @classmethod
-    async def update_room(cls, room_id: UUID, room: RoomUpdate) -> Room:
-        async with async_session_maker() as session:
+    async def update_room(
+        cls, room_id: UUID, room: RoomUpdate, session: AsyncSession | None = None
+    ) -> Room:
+        async with session_scope(session) as session:
             db_room = await RoomDAO.find_one_or_none(session, RoomModel.id == room_id)
             if db_room is None:
                 raise EntityNotFound("room")
@@ -109,16 +224,152 @@ class RoomService:
                 session, RoomModel.id == room_id, object_in=room_in
             )
             await session.commit()
+        async_read_session_maker.stick("rooms")
+        catalog_cache.bump(room_id)
         return room_update
 
     @classmethod
-    async def delete_room(cls, room_id: UUID) -> None:
-        async with async_session_maker() as session:
+    async def delete_room(
+        cls, room_id: UUID, session: AsyncSession | None = None
+    ) -> None:
+        async with session_scope(session) as session:
             await RoomDAO.delete(session, RoomModel.id == room_id)
             await session.commit()
+        async_read_session_maker.stick("rooms")
+        catalog_cache.bump(room_id)
+        availability_index.remove_room(room_id)
 
     @classmethod
     async def count_rooms(cls) -> int:
         async with async_session_maker() as session:
             count = await RoomDAO.count(session)
         return count or 0
+
+    @classmethod
+    async def get_availability(
+        cls,
+        room_ids: list[UUID],
+        date_from: date,
+        date_to: date,
+    ) -> list[RoomAvailability]:
+        days = (date_to - date_from).days
+        if not 0 < days <= settings.AVAILABILITY_MAX_DAYS:
+            raise InvalidDateRange(settings.AVAILABILITY_MAX_DAYS)
+
+        intervals: dict[UUID, list[tuple[date, date]]] = {}
+        async with async_read_session_maker("rooms") as session:
+            if availability_index.covers(date_from):
+                for room_id in await RoomDAO.find_ids(session, room_ids):
+                    intervals[room_id] = availability_index.booked_intervals(
+                        room_id, date_from, date_to
+                    )
+            else:
+                rows = await RoomDAO.find_booked_intervals(
+                    session, room_ids, date_from, date_to
+                )
+                for room_id, booked_from, booked_to in rows:
+                    room_intervals = intervals.setdefault(room_id, [])
+                    if booked_from is not None:
+                        room_intervals.append((booked_from, booked_to))
+
+        result = []
+        for room_id in room_ids:
+            if room_id not in intervals:
+                continue
+
+            booked = bytearray(b"0" * days)
+            for booked_from, booked_to in intervals[room_id]:
+                start = (max(booked_from, date_from) - date_from).days
+                end = (min(booked_to, date_to) - date_from).days
+                booked[start:end] = b"1" * (end - start)
+
+            result.append(
+                RoomAvailability(
+                    room_id=room_id,
+                    date_from=date_from,
+                    date_to=date_to,
+                    booked=booked.decode(),
+                )
+            )
+        return result
+
+    @classmethod
+    async def get_quotes(cls, quote: QuoteRequest) -> list[RoomQuote]:
+        ranges = [(stay.date_from, stay.date_to) for stay in quote.ranges]
+        for date_from, date_to in ranges:
+            if (date_to - date_from).days > settings.AVAILABILITY_MAX_DAYS:
+                raise InvalidDateRange(settings.AVAILABILITY_MAX_DAYS)
+
+        filters = []
+        limit = quote.limit
+        if quote.room_ids is not None:
+            filters.append(RoomModel.id.in_(quote.room_ids))
+            limit = None
+        if quote.min_price is not None:
+            filters.append(RoomModel.price_per_day >= quote.min_price)
+        if quote.max_price is not None:
+            filters.append(RoomModel.price_per_day <= quote.max_price)
+        if quote.places is not None:
+            filters.append(RoomModel.places == quote.places)
+
+        prices: dict[UUID, float] = {}
+        available: dict[UUID, list[bool]] = {}
+        async with async_read_session_maker("rooms") as session:
+            if availability_index.covers(min(date_from for date_from, _ in ranges)):
+                for room_id, price_per_day in await RoomDAO.find_prices(
+                    session, *filters, limit=limit
+                ):
+                    prices[room_id] = price_per_day
+                    available[room_id] = [
+                        availability_index.is_free(room_id, date_from, date_to)
+                        for date_from, date_to in ranges
+                    ]
+            else:
+                for room_id, price_per_day, _, is_free in await RoomDAO.find_quotes(
+                    session, ranges, *filters, limit=limit
+                ):
+                    prices[room_id] = price_per_day
+                    available.setdefault(room_id, []).append(is_free)
+
+        room_ids = prices.keys()
+        if quote.room_ids is not None:
+            room_ids = [
+                room_id
+                for room_id in dict.fromkeys(quote.room_ids)
+                if room_id in prices
+            ]
+
+        return [
+            RoomQuote(
+                room_id=room_id,
+                price_per_day=prices[room_id],
+                quotes=[
+                    StayQuote(
+                        date_from=date_from,
+                        date_to=date_to,
+                        nights=(date_to - date_from).days,
+                        total_price=prices[room_id] * (date_to - date_from).days,
+                        available=is_free,
+                    )
+                    for (date_from, date_to), is_free in zip(ranges, available[room_id])
+                ],
+            )
+            for room_id in room_ids
+        ]
+
+    @classmethod
+    async def export_rooms(cls, export_format: ExportFormat) -> AsyncIterator[bytes]:
+        columns = [
+            RoomModel.id,
+            RoomModel.name,
+            RoomModel.price_per_day,
+            RoomModel.places,
+        ]
+        async with async_read_session_maker() as session:
+            partitions = RoomDAO.stream(
+                session, columns=columns, batch_size=settings.EXPORT_BATCH_SIZE
+            )
+            async for chunk in encode_rows(
+                partitions, [column.key for column in columns], export_format
+            ):
+                yield chunk
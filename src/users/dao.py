@@ -1,3 +1,6 @@
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from .models import UserModel
 from .schemas import UserCreateDB, UserUpdateDB
 from ..dao import BaseDAO
@@ -5,3 +8,17 @@ from ..dao import BaseDAO
 
 class UserDAO(BaseDAO[UserModel, UserCreateDB, UserUpdateDB]):
     model = UserModel
+
+    @classmethod
+    async def add_strict(
+        cls,
+        session: AsyncSession,
+        object_in: UserCreateDB,
+    ) -> UserModel:
+        statement = (
+            insert(cls.model)
+            .values(**object_in.model_dump(exclude_unset=True))
+            .returning(cls.model)
+        )
+        result = await session.execute(statement)
+        return result.scalars().one()
@@ -1,6 +1,6 @@
 from uuid import UUID, uuid4
 
-from sqlalchemy import String
+from sqlalchemy import Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import UUID as pgUUID
 
@@ -9,6 +9,7 @@ from ..database import Base
 
 class UserModel(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("users_created_at_id_idx", "created_at", "id"),)
 
     id: Mapped[UUID] = mapped_column(
         pgUUID, primary_key=True, index=True, default=uuid4
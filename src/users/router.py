@@ -5,6 +5,8 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, Query, Path, Response, Request
 
 from ..database import Message
+from ..dependencies import RequestSession
+from ..pagination import CountMode
 
 from .schemas import User, Users, UserUpdate
 from .service import UserService
@@ -23,10 +25,15 @@ user_router = APIRouter(prefix="/users", tags=["user"])
     response_model=Users,
 )
 async def get_users(
+    session: RequestSession,
+    cursor: str | None = None,
     offset: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(ge=1, le=100)] = 100,
+    count: CountMode = CountMode.exact,
 ) -> Users:
-    return await UserService.get_users(offset=offset, limit=limit)
+    return await UserService.get_users(
+        cursor=cursor, offset=offset, limit=limit, count=count, session=session
+    )
 
 
 @user_router.get(
@@ -36,7 +43,7 @@ async def get_users(
 async def get_user_self(
     current_user: User = Depends(get_current_active_user),
 ) -> User:
-    return await UserService.get_user(current_user.id)
+    return current_user
 
 
 @user_router.put(
@@ -45,9 +52,10 @@ async def get_user_self(
 )
 async def update_current_user(
     user: UserUpdate,
+    session: RequestSession,
     current_user: User = Depends(get_current_active_user),
 ) -> User:
-    return await UserService.update_user(current_user.id, user)
+    return await UserService.update_user(current_user.id, user, session)
 
 
 @user_router.delete(
@@ -57,13 +65,14 @@ async def update_current_user(
 async def delete_current_user(
     request: Request,
     response: Response,
+    session: RequestSession,
     current_user: User = Depends(get_current_active_user),
 ) -> Message:
     response.delete_cookie("access_token")
     response.delete_cookie("refresh_token")
 
-    await AuthService.logout(request.cookies.get("refresh_token"))
-    await UserService.delete_user(current_user.id)
+    await AuthService.logout(request.cookies.get("refresh_token"), session)
+    await UserService.delete_user(current_user.id, session)
     return Message(message="User deleted successfully")
 
 
@@ -73,9 +82,10 @@ async def delete_current_user(
     response_model=User,
 )
 async def get_user(
+    session: RequestSession,
     user_id: UUID = Path(...),
 ) -> User:
-    return await UserService.get_user(user_id)
+    return await UserService.get_user(user_id, session)
 
 
 @user_router.put(
@@ -85,9 +95,10 @@ async def get_user(
 )
 async def update_user(
     user: UserUpdate,
+    session: RequestSession,
     user_id: UUID = Path(...),
 ) -> User:
-    return await UserService.update_user_from_superuser(user_id, user)
+    return await UserService.update_user_from_superuser(user_id, user, session)
 
 
 @user_router.delete(
@@ -96,7 +107,8 @@ async def update_user(
     response_model=Message,
 )
 async def delete_user(
+    session: RequestSession,
     user_id: UUID = Path(...),
 ) -> Message:
-    await UserService.delete_user_from_superuser(user_id)
+    await UserService.delete_user_from_superuser(user_id, session)
     return Message(message="User was deleted")
@@ -55,7 +55,8 @@ class User(UserBase):
 
 class Users(BaseModel):
     data: list[User]
-    count: int
+    count: int | None
+    next_cursor: str | None = None
 
 
 class UserCreateDB(UserBase):
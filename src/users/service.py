@@ -1,9 +1,17 @@
 from uuid import UUID
 
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from src.exceptions import EntityAlreadyExists, EntityNotFound
 
-from ..database import async_session_maker
-from ..auth.utils import get_password_hash
+from ..cache import TTLCache
+from ..config import settings
+from ..dao import get_violated_constraint
+from ..database import async_read_session_maker, async_session_maker, session_scope
+from ..pagination import CountMode
+from ..monitoring.metrics import Counter, Gauge
+from ..auth.hashing import password_hasher
 from .schemas import (
     UserCreate,
     UserUpdate,
@@ -14,56 +22,107 @@ from .schemas import (
 from .models import UserModel
 from .dao import UserDAO
 
+user_cache: TTLCache[UUID, UserModel] = TTLCache(
+    maxsize=settings.USER_CACHE_MAXSIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+Counter(
+    "user_cache_hits",
+    "Users served from the user cache.",
+    function=lambda: user_cache.hits,
+)
+Counter(
+    "user_cache_misses",
+    "User lookups that went to the database.",
+    function=lambda: user_cache.misses,
+)
+Gauge(
+    "user_cache_size",
+    "Users currently cached.",
+    function=lambda: len(user_cache),
+)
+
 
 class UserService:
     @classmethod
-    async def register_new_user(cls, user: UserCreate) -> UserModel:
-        async with async_session_maker() as session:
+    async def register_new_user(
+        cls, user: UserCreate, session: AsyncSession | None = None
+    ) -> UserModel:
+        async with session_scope(session) as session:
+            # Fast path only: a concurrent registration can still take the
+            # email while bcrypt runs, which the unique index catches below.
             user_exist = await UserDAO.find_one_or_none(session, email=user.email)
             if user_exist:
                 raise EntityAlreadyExists("user")
+            # Hand the connection back to the pool while bcrypt runs.
+            await session.commit()
 
-            db_user = await UserDAO.add(
-                session,
-                UserCreateDB(
-                    **user.model_dump(
-                        exclude={
-                            "is_active",
-                            "is_superuser",
-                            "password",
-                            "password_repeat",
-                        },
+            hashed_password = await password_hasher.hash(user.password)
+            try:
+                db_user = await UserDAO.add_strict(
+                    session,
+                    UserCreateDB(
+                        **user.model_dump(
+                            exclude={
+                                "is_active",
+                                "is_superuser",
+                                "password",
+                                "password_repeat",
+                            },
+                        ),
+                        hashed_password=hashed_password,
                     ),
-                    hashed_password=get_password_hash(user.password)
-                ),
-            )
-            await session.commit()
+                )
+                await session.commit()
+            except IntegrityError as e:
+                if get_violated_constraint(e) == "users_email_idx":
+                    raise EntityAlreadyExists("user")
+                raise
+        async_read_session_maker.stick(("users", db_user.id))
         return db_user
 
     @classmethod
-    async def get_user(cls, user_id: UUID) -> UserModel:
-        async with async_session_maker() as session:
+    async def get_user(
+        cls, user_id: UUID, session: AsyncSession | None = None
+    ) -> UserModel:
+        db_user = user_cache.get(user_id)
+        if db_user is not None:
+            return db_user
+
+        async with async_read_session_maker.scope(
+            session, ("users", user_id)
+        ) as session:
             db_user = await UserDAO.find_one_or_none(session, id=user_id)
         if db_user is None:
             raise EntityNotFound("user")
+        user_cache.set(user_id, db_user)
         return db_user
 
     @classmethod
-    async def get_user_by_email(cls, email: str) -> UserModel:
-        async with async_session_maker() as session:
+    async def get_user_by_email(
+        cls, email: str, session: AsyncSession | None = None
+    ) -> UserModel:
+        async with session_scope(session) as session:
             db_user = await UserDAO.find_one_or_none(session, email=email)
         if db_user is None:
             raise EntityNotFound("user")
         return db_user
 
     @classmethod
-    async def update_user(cls, user_id: UUID, user: UserUpdate) -> UserModel:
-        async with async_session_maker() as session:
+    async def update_user(
+        cls, user_id: UUID, user: UserUpdate, session: AsyncSession | None = None
+    ) -> UserModel:
+        hashed_password = None
+        if user.password:
+            hashed_password = await password_hasher.hash(user.password)
+
+        async with session_scope(session) as session:
             db_user = await UserDAO.find_one_or_none(session, UserModel.id == user_id)
             if db_user is None:
                 raise EntityNotFound("user")
 
-            if user.password:
+            if hashed_password:
                 user_in = UserUpdateDB(
                     **user.model_dump(
                         exclude={
@@ -74,7 +133,7 @@ class UserService:
                         },
                         exclude_unset=True,
                     ),
-                    hashed_password=get_password_hash(user.password)
+                    hashed_password=hashed_password,
                 )
             else:
                 user_in = user.model_dump(exclude_unset=True)
@@ -83,11 +142,15 @@ class UserService:
                 session, UserModel.id == user_id, object_in=user_in
             )
             await session.commit()
-            return user_update
+        user_cache.invalidate(user_id)
+        async_read_session_maker.stick(("users", user_id))
+        return user_update
 
     @classmethod
-    async def delete_user(cls, user_id: UUID) -> None:
-        async with async_session_maker() as session:
+    async def delete_user(
+        cls, user_id: UUID, session: AsyncSession | None = None
+    ) -> None:
+        async with session_scope(session) as session:
             db_user = await UserDAO.find_one_or_none(session, id=user_id)
             if db_user is None:
                 raise EntityNotFound("user")
@@ -95,23 +158,30 @@ class UserService:
                 session, UserModel.id == user_id, object_in={"is_active": False}
             )
             await session.commit()
+        user_cache.invalidate(user_id)
+        async_read_session_maker.stick(("users", user_id))
 
     @classmethod
     async def get_users(
         cls,
+        cursor: str | None = None,
         offset: int = 0,
         limit: int = 100,
+        count: CountMode = CountMode.exact,
+        session: AsyncSession | None = None,
     ) -> Users:
-        async with async_session_maker() as session:
-            users = await UserDAO.find_all(
+        async with session_scope(session) as session:
+            users, next_cursor, total = await UserDAO.find_page(
                 session,
+                keyset=[UserModel.created_at, UserModel.id],
+                cursor=cursor,
                 offset=offset,
                 limit=limit,
+                count_mode=count,
             )
-            if not users:
-                raise EntityNotFound("user")
-            count = await UserDAO.count(session)
-        return Users(data=users, count=count)
+        if not users:
+            raise EntityNotFound("user")
+        return Users(data=users, count=total, next_cursor=next_cursor)
 
     @classmethod
     async def count_users(cls) -> int:
@@ -121,9 +191,9 @@ class UserService:
 
     @classmethod
     async def update_user_from_superuser(
-        cls, user_id: UUID, user: UserUpdate
+        cls, user_id: UUID, user: UserUpdate, session: AsyncSession | None = None
     ) -> UserModel:
-        async with async_session_maker() as session:
+        async with session_scope(session) as session:
             db_user = await UserDAO.find_one_or_none(session, UserModel.id == user_id)
             if db_user is None:
                 raise EntityNotFound("user")
@@ -133,10 +203,16 @@ class UserService:
                 session, UserModel.id == user_id, object_in=user_in
             )
             await session.commit()
-            return user_update
+        user_cache.invalidate(user_id)
+        async_read_session_maker.stick(("users", user_id))
+        return user_update
 
     @classmethod
-    async def delete_user_from_superuser(cls, user_id: UUID) -> None:
-        async with async_session_maker() as session:
+    async def delete_user_from_superuser(
+        cls, user_id: UUID, session: AsyncSession | None = None
+    ) -> None:
+        async with session_scope(session) as session:
             await UserDAO.delete(session, UserModel.id == user_id)
             await session.commit()
+        user_cache.invalidate(user_id)
+        async_read_session_maker.stick(("users", user_id))